@@ -0,0 +1,238 @@
+"""
+This module provides the codecs used to decode the request bodies and to
+encode the responses.
+
+By default, the json module of the standard library is used. An other codec
+can be set for an application using setup() or for a view using the
+codec attribute of PydanticView.
+
+Example:
+
+    from aiohttp_pydantic import codec
+
+    app = web.Application()
+    codec.setup(app, codec.fast_json_codec())
+
+Other codecs can be registered on an application, they are negotiated by
+content type: a request body is decoded using the codec of its Content-Type
+and a response is encoded using the codec preferred by the Accept header.
+
+    codec.register(app, codec.msgpack_codec(), codec.cbor_codec())
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Optional, Tuple, Union
+
+from aiohttp.web import Application, Response
+from aiohttp.web_request import BaseRequest
+from pydantic.json import pydantic_encoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+CODEC_KEY = "aiohttp_pydantic codec"
+CODECS_KEY = "aiohttp_pydantic codecs"
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+CBOR_CONTENT_TYPE = "application/cbor"
+
+
+class Codec:
+    """
+    A pair of functions to decode and encode a document.
+
+    loads - takes bytes or str and returns the decoded python object.
+    dumps - takes a python object and returns the encoded bytes. The
+            provided codecs encode the pydantic models and the types
+            supported by pydantic such as datetime or UUID.
+    """
+
+    def __init__(
+        self,
+        loads: Callable[[Union[bytes, str]], Any],
+        dumps: Callable[[Any], bytes],
+        content_type: str = "application/json",
+    ):
+        self.loads = loads
+        self.dumps = dumps
+        self.content_type = content_type
+
+    def response(self, data: Any, status: int = 200) -> Response:
+        """
+        Returns a web.Response containing the encoded data.
+        """
+        return Response(
+            body=self.dumps(data), status=status, content_type=self.content_type
+        )
+
+
+def _json_dumps(data: Any) -> bytes:
+    return json.dumps(data, default=pydantic_encoder).encode()
+
+
+STDLIB_JSON_CODEC = Codec(json.loads, _json_dumps)
+
+
+def fast_json_codec() -> Codec:
+    """
+    Returns a codec using orjson or ujson if one of them is installed,
+    else returns the codec using the json module of the standard library.
+    """
+    if orjson is not None:
+        return Codec(
+            orjson.loads,
+            lambda data: orjson.dumps(
+                data, default=pydantic_encoder, option=orjson.OPT_NON_STR_KEYS
+            ),
+        )
+
+    if ujson is not None:
+        return Codec(
+            ujson.loads,
+            lambda data: ujson.dumps(data, default=pydantic_encoder).encode(),
+        )
+
+    return STDLIB_JSON_CODEC
+
+
+def msgpack_codec() -> Codec:
+    """
+    Returns a codec using MessagePack, msgpack must be installed.
+    """
+    if msgpack is None:
+        raise RuntimeError("The msgpack package is required by msgpack_codec()")
+    return Codec(
+        msgpack.unpackb,
+        lambda data: msgpack.packb(data, default=pydantic_encoder),
+        MSGPACK_CONTENT_TYPE,
+    )
+
+
+def _cbor_default(encoder, value):
+    encoder.encode(pydantic_encoder(value))
+
+
+def cbor_codec() -> Codec:
+    """
+    Returns a codec using CBOR, cbor2 must be installed.
+    """
+    if cbor2 is None:
+        raise RuntimeError("The cbor2 package is required by cbor_codec()")
+    return Codec(
+        cbor2.loads,
+        lambda data: cbor2.dumps(data, default=_cbor_default),
+        CBOR_CONTENT_TYPE,
+    )
+
+
+def setup(app: Application, codec: Codec):
+    """
+    Set the codec used by the views of app and its sub-applications.
+    """
+    app[CODEC_KEY] = codec
+
+
+def get_codec(request: BaseRequest, codec: Optional[Codec] = None) -> Codec:
+    """
+    Returns codec if it is not None else the codec set on the application
+    handling the request.
+    """
+    if codec is not None:
+        return codec
+    return request.config_dict.get(CODEC_KEY, STDLIB_JSON_CODEC)
+
+
+def register(app: Application, *codecs: Codec):
+    """
+    Register codecs negotiated by content type on the views of app and its
+    sub-applications. The codec set using setup() or the codec attribute of
+    the view is used when no registered codec matches.
+    """
+    registered = dict(app.get(CODECS_KEY, {}))
+    registered.update((codec.content_type, codec) for codec in codecs)
+    app[CODECS_KEY] = registered
+
+
+def registered_codecs(app: Mapping[str, Any]) -> Mapping[str, Codec]:
+    """
+    Returns the codecs registered by content type on app, app can be the
+    config_dict of a request.
+    """
+    return app.get(CODECS_KEY, {})
+
+
+def get_request_codec(request: BaseRequest, codec: Optional[Codec] = None) -> Codec:
+    """
+    Returns the registered codec of the request Content-Type, or
+    get_codec(request, codec) if no registered codec matches.
+    """
+    registered = registered_codecs(request.config_dict)
+    if registered:
+        content_type_codec = registered.get(request.content_type)
+        if content_type_codec is not None:
+            return content_type_codec
+    return get_codec(request, codec)
+
+
+def get_response_codec(request: BaseRequest, codec: Optional[Codec] = None) -> Codec:
+    """
+    Returns the codec preferred by the Accept header of the request among
+    get_codec(request, codec) and the registered codecs. The default codec
+    is returned if the client accepts any media type or none of them.
+    """
+    default = get_codec(request, codec)
+    registered = registered_codecs(request.config_dict)
+    accept = request.headers.get("Accept")
+    if not registered or not accept:
+        return default
+
+    for media_range in _media_ranges(accept):
+        if media_range == default.content_type:
+            return default
+        registered_codec = registered.get(media_range)
+        if registered_codec is not None:
+            return registered_codec
+        if media_range in ("*/*", "application/*"):
+            return default
+    return default
+
+
+@lru_cache(maxsize=256)
+def _media_ranges(accept: str) -> Tuple[str, ...]:
+    """
+    Returns the media ranges of an Accept header sorted by decreasing
+    quality, the media ranges having a null quality are excluded.
+    """
+    ranges = []
+    for position, item in enumerate(accept.split(",")):
+        media_range, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranges.append((-quality, position, media_range.strip().lower()))
+    return tuple(media_range for _, _, media_range in sorted(ranges))
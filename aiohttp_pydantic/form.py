@@ -0,0 +1,196 @@
+"""
+Read urlencoded and multipart/form-data request bodies.
+
+Annotate a body argument with Form() to validate the form fields using the
+model. The file parts are exposed as UploadFile, their content is written in
+a spooled temporary file while the body is read, so large uploads are never
+kept in memory:
+
+    class UploadForm(BaseModel):
+        title: str
+        document: UploadFile
+
+    class UploadView(PydanticView):
+        async def post(self, form: Annotated[UploadForm, Form()]):
+            async for chunk in form.document.chunks():
+                ...
+"""
+
+import asyncio
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Optional
+
+from aiohttp import hdrs
+from aiohttp.multipart import BodyPartReader
+from aiohttp.web_request import BaseRequest
+from multidict import CIMultiDictProxy, MultiDict
+
+MULTIPART_CONTENT_TYPE = "multipart/form-data"
+URLENCODED_CONTENT_TYPE = "application/x-www-form-urlencoded"
+FORM_CONTENT_TYPES = (MULTIPART_CONTENT_TYPE, URLENCODED_CONTENT_TYPE)
+
+CHUNK_SIZE = 2**16
+
+
+class Form:
+    """
+    Marks a body argument read from a form, use it to annotate the argument:
+
+        async def post(self, form: Annotated[UploadForm, Form()]):
+
+    max_memory_size - the uploaded files are kept in memory until this size,
+                      and written on disk beyond.
+    max_field_size - maximal size of a field which is not a file, a larger
+                     field is rejected with the status 413.
+
+    The client_max_size of the application is not applied to the multipart
+    bodies: without BodyConstraints, the files written on disk and the number
+    of fields are not limited. Use BodyConstraints(max_bytes=..., max_items=...)
+    to limit the size of the whole body and its number of fields.
+    """
+
+    def __init__(self, max_memory_size: int = 2**20, max_field_size: int = 2**20):
+        self.max_memory_size = max_memory_size
+        self.max_field_size = max_field_size
+
+    def __repr__(self):
+        return (
+            f"Form(max_memory_size={self.max_memory_size!r},"
+            f" max_field_size={self.max_field_size!r})"
+        )
+
+
+class UploadFile:
+    """
+    A file sent in a multipart/form-data body. The content is stored in a
+    SpooledTemporaryFile deleted when the file is closed or garbage collected.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        content_type: Optional[str],
+        headers: CIMultiDictProxy,
+        file: SpooledTemporaryFile,
+        size: int,
+    ):
+        self.filename = filename
+        self.content_type = content_type
+        self.headers = headers
+        self.file = file
+        self.size = size
+
+    def __repr__(self):
+        return (
+            f"UploadFile(filename={self.filename!r},"
+            f" content_type={self.content_type!r}, size={self.size!r})"
+        )
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read at most size bytes of the file, the whole file if size is -1.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.file.read, size
+        )
+
+    async def chunks(self, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Yields the content of the file from its start.
+        """
+        self.file.seek(0)
+        while chunk := await self.read(chunk_size):
+            yield chunk
+
+    def close(self):
+        self.file.close()
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value):
+        if not isinstance(value, cls):
+            raise TypeError("value is not an uploaded file")
+        return value
+
+    @classmethod
+    def __modify_schema__(cls, field_schema):
+        field_schema.update(type="string", format="binary")
+
+
+class FieldTooLarge(Exception):
+    """
+    Raised when a form field, the whole body or its number of parts exceeds
+    its limit.
+    """
+
+
+async def read_multipart(
+    request: BaseRequest,
+    form: Form,
+    max_bytes: Optional[int] = None,
+    max_parts: Optional[int] = None,
+) -> MultiDict:
+    """
+    Returns the fields of a multipart/form-data body, the files are returned
+    as UploadFile. The parts are read chunk by chunk, a chunk written beyond
+    max_memory_size is written by the default executor.
+    """
+    loop = asyncio.get_running_loop()
+    fields = MultiDict()
+    read = 0
+    nb_parts = 0
+    try:
+        reader = await request.multipart()
+        async for part in reader:
+            if not isinstance(part, BodyPartReader):
+                raise ValueError("Nested multipart body")
+            nb_parts += 1
+            if max_parts is not None and nb_parts > max_parts:
+                raise FieldTooLarge("Too many items in body")
+            if part.name is None:
+                continue
+
+            if part.filename is None:
+                value = bytearray()
+                while chunk := await part.read_chunk(CHUNK_SIZE):
+                    read += len(chunk)
+                    value += chunk
+                    if len(value) > form.max_field_size:
+                        raise FieldTooLarge(f"Field {part.name} too large")
+                    if max_bytes is not None and read > max_bytes:
+                        raise FieldTooLarge("Body too large")
+                fields.add(part.name, value.decode(part.get_charset("utf-8")))
+                continue
+
+            file = SpooledTemporaryFile(max_size=form.max_memory_size)
+            content_type = part.headers.get(hdrs.CONTENT_TYPE)
+            upload = UploadFile(part.filename, content_type, part.headers, file, 0)
+            fields.add(part.name, upload)
+            size = 0
+            while chunk := await part.read_chunk(CHUNK_SIZE):
+                read += len(chunk)
+                if max_bytes is not None and read > max_bytes:
+                    raise FieldTooLarge("Body too large")
+                size += len(chunk)
+                if size > form.max_memory_size:
+                    await loop.run_in_executor(None, file.write, chunk)
+                else:
+                    file.write(chunk)
+            file.seek(0)
+            upload.size = size
+    except BaseException:
+        close_files(fields)
+        raise
+    return fields
+
+
+def close_files(fields: MultiDict):
+    """
+    Close the UploadFile of fields.
+    """
+    for value in fields.values():
+        if isinstance(value, UploadFile):
+            value.close()
@@ -1,13 +1,74 @@
 import abc
-from inspect import signature
-from json.decoder import JSONDecodeError
-from typing import Callable, Tuple
-
-from aiohttp.web_exceptions import HTTPBadRequest
+import json
+import re
+import typing
+from codecs import getincrementaldecoder
+from inspect import signature, unwrap
+from types import MappingProxyType
+from urllib.parse import parse_qsl
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from weakref import WeakKeyDictionary
+
+from aiohttp import hdrs
+from aiohttp.web_exceptions import (
+    HTTPBadRequest,
+    HTTPClientError,
+    HTTPRequestEntityTooLarge,
+    HTTPUnsupportedMediaType,
+)
 from aiohttp.web_request import BaseRequest
-from pydantic import BaseModel
+from multidict import MultiDict, MultiMapping
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+
+from .codec import Codec, get_codec, get_request_codec
+from .form import (
+    FORM_CONTENT_TYPES,
+    MULTIPART_CONTENT_TYPE,
+    URLENCODED_CONTENT_TYPE,
+    FieldTooLarge,
+    Form,
+    close_files,
+    read_multipart,
+)
+from .utils import get_stream_model, is_pydantic_base_model, unwrap_annotated
+
+NDJSON_CONTENT_TYPES = frozenset(
+    ("application/x-ndjson", "application/ndjson", "application/jsonl")
+)
+
+
+def _supported_content_encodings() -> frozenset:
+    """
+    Returns the content-codings of request bodies decompressed by aiohttp.
+    """
+    encodings = {"identity", "gzip", "deflate"}
+    try:
+        from aiohttp import compression_utils
+    except ImportError:
+        return frozenset(encodings)
+
+    # The flags are added by aiohttp versions supporting these codings.
+    if getattr(compression_utils, "HAS_BROTLI", False):
+        encodings.add("br")
+    if getattr(compression_utils, "HAS_ZSTD", False):
+        encodings.add("zstd")
+    return frozenset(encodings)
+
 
-from .utils import is_pydantic_base_model
+# aiohttp decompresses the request bodies using these content-codings while
+# the body is read, the injectors always see the decompressed body.
+SUPPORTED_CONTENT_ENCODINGS = _supported_content_encodings()
 
 
 class AbstractInjector(metaclass=abc.ABCMeta):
@@ -35,6 +96,12 @@ class AbstractInjector(metaclass=abc.ABCMeta):
         Get elements in request and inject them in args_view or kwargs_view.
         """
 
+    def error_location(self, error: dict) -> str:
+        """
+        Returns the part of request where the validation error was found.
+        """
+        return self.context
+
 
 class MatchInfoGetter(AbstractInjector):
     """
@@ -44,7 +111,7 @@ class MatchInfoGetter(AbstractInjector):
     context = "path"
 
     def __init__(self, args_spec: dict, default_values: dict):
-        attrs = {"__annotations__": args_spec}
+        attrs = {"__annotations__": dict(args_spec)}
         attrs.update(default_values)
         self.model = type("PathModel", (BaseModel,), attrs)
 
@@ -52,6 +119,217 @@ class MatchInfoGetter(AbstractInjector):
         args_view.extend(self.model(**request.match_info).dict().values())
 
 
+class BodyConstraints:
+    """
+    Limits checked before decoding the request body, use it to annotate the
+    body argument:
+
+        async def post(self, article: Annotated[Article, BodyConstraints(...)]):
+
+    max_bytes - maximal size of the body. It replaces the client_max_size of
+                the application, the body is rejected with the status 413 as
+                soon as the Content-Length or the read bytes exceed it. The
+                size of a compressed body is counted after decompression.
+    content_type - accepted Content-Type or iterable of accepted Content-Types,
+                   other content types are rejected with the status 415.
+    max_depth - maximal nesting level of the arrays and objects of the
+                decoded body.
+    max_items - maximal number of array items and object members of the
+                decoded body, or maximal number of items of a streamed body.
+                A body nested too deeply or having too many items is rejected
+                with the status 413.
+    max_item_bytes - maximal size of an item of a streamed body, the
+                     client_max_size of the application by default. A larger
+                     item is rejected with the status 413.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        content_type: Union[str, Iterable[str], None] = None,
+        max_depth: Optional[int] = None,
+        max_items: Optional[int] = None,
+        max_item_bytes: Optional[int] = None,
+    ):
+        self.max_bytes = max_bytes
+        if isinstance(content_type, str):
+            content_type = (content_type,)
+        self.content_types = None if content_type is None else tuple(content_type)
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.max_item_bytes = max_item_bytes
+
+    def __repr__(self):
+        return (
+            f"BodyConstraints(max_bytes={self.max_bytes!r},"
+            f" content_type={self.content_types!r}, max_depth={self.max_depth!r},"
+            f" max_items={self.max_items!r}, max_item_bytes={self.max_item_bytes!r})"
+        )
+
+    def check_content_type(self, request: BaseRequest):
+        if self.content_types is not None:
+            if request.content_type not in self.content_types:
+                raise _unsupported_content_type(self.content_types)
+
+    def check_content_length(self, request: BaseRequest):
+        content_length = request.content_length
+        if self.max_bytes is not None and content_length is not None:
+            if content_length > self.max_bytes:
+                raise HTTPRequestEntityTooLarge(
+                    max_size=self.max_bytes, actual_size=content_length
+                )
+
+    async def limit_size(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Yields the chunks until the read bytes exceed max_bytes.
+        """
+        read = 0
+        async for chunk in chunks:
+            read += len(chunk)
+            if self.max_bytes is not None and read > self.max_bytes:
+                raise HTTPRequestEntityTooLarge(
+                    max_size=self.max_bytes, actual_size=read
+                )
+            yield chunk
+
+    async def read(self, request: BaseRequest) -> bytes:
+        """
+        Returns the request body, the body is read while it does not exceed
+        max_bytes.
+        """
+        self.check_content_type(request)
+        if self.max_bytes is None:
+            return await request.read()
+
+        body = _read_bytes(request)
+        if body is not None:
+            if len(body) > self.max_bytes:
+                raise HTTPRequestEntityTooLarge(
+                    max_size=self.max_bytes, actual_size=len(body)
+                )
+            return body
+
+        self.check_content_length(request)
+        buffer = bytearray()
+        async for chunk in self.limit_size(request.content.iter_any()):
+            buffer += chunk
+        body = bytes(buffer)
+        # request.read(), text(), json() and post() return the body read here.
+        request._read_bytes = body
+        return body
+
+    def check_structure(self, document: Any):
+        """
+        Check the nesting level and the number of items of the decoded body.
+        """
+        if self.max_depth is None and self.max_items is None:
+            return
+
+        nb_items = 0
+        stack = [(document, 0)]
+        while stack:
+            value, depth = stack.pop()
+            if isinstance(value, dict):
+                children = value.values()
+            elif isinstance(value, list):
+                children = value
+            else:
+                continue
+
+            depth += 1
+            if self.max_depth is not None and depth > self.max_depth:
+                raise _body_too_large("Body nested too deeply")
+            nb_items += len(children)
+            if self.max_items is not None and nb_items > self.max_items:
+                raise _body_too_large("Too many items in body")
+            stack.extend((child, depth) for child in children)
+
+
+# BodyConstraints.read() stores the body it reads in the private attribute
+# used by aiohttp to cache the body returned by request.read(), so the body
+# is not read twice. Fail at import if aiohttp no longer has this attribute,
+# the body would be silently lost for the handler and the middlewares.
+if "_read_bytes" not in getattr(BaseRequest, "ATTRS", ()):
+    raise ImportError(
+        "aiohttp_pydantic does not support this aiohttp version,"
+        " BaseRequest._read_bytes is missing"
+    )
+
+
+def _read_bytes(request: BaseRequest) -> Optional[bytes]:
+    """
+    Returns the body cached by request.read(), or None if it was not read.
+    """
+    return getattr(request, "_read_bytes", None)
+
+
+def _check_content_encoding(request: BaseRequest):
+    """
+    Rejects the bodies compressed using a content-coding aiohttp cannot
+    decompress, as described in RFC 7694.
+    """
+    encoding = request.headers.get(hdrs.CONTENT_ENCODING)
+    if encoding is None:
+        return
+    if encoding.strip().lower() not in SUPPORTED_CONTENT_ENCODINGS:
+        encodings = sorted(SUPPORTED_CONTENT_ENCODINGS)
+        raise HTTPUnsupportedMediaType(
+            text=json.dumps(
+                {"error": "Unsupported Content-Encoding", "expected": encodings}
+            ),
+            content_type="application/json",
+            headers={hdrs.ACCEPT_ENCODING: ", ".join(encodings)},
+        )
+
+
+def _unsupported_content_type(expected: Iterable[str]) -> HTTPUnsupportedMediaType:
+    return HTTPUnsupportedMediaType(
+        text=json.dumps(
+            {"error": "Unsupported Content-Type", "expected": list(expected)}
+        ),
+        content_type="application/json",
+    )
+
+
+class _BodyTooLarge(HTTPRequestEntityTooLarge):
+    """
+    413 response to a body exceeding a limit described by the error text,
+    such as its nesting level or the size of an item, instead of the sizes.
+    """
+
+    def __init__(self, error: str):
+        # HTTPRequestEntityTooLarge only uses the sizes in its default text.
+        HTTPClientError.__init__(
+            self, text=json.dumps({"error": error}), content_type="application/json"
+        )
+
+
+def _body_too_large(error: str) -> HTTPRequestEntityTooLarge:
+    return _BodyTooLarge(error)
+
+
+def get_body_constraints(annotation) -> Tuple[Any, Optional[BodyConstraints]]:
+    """
+    Returns the type of a body argument and its BodyConstraints or None.
+    """
+    type_, metadata = unwrap_annotated(annotation)
+    for item in metadata:
+        if isinstance(item, BodyConstraints):
+            return type_, item
+    return type_, None
+
+
+def get_form(annotation) -> Optional[Form]:
+    """
+    Returns the Form annotating a body argument or None.
+    """
+    _, metadata = unwrap_annotated(annotation)
+    for item in metadata:
+        if isinstance(item, Form):
+            return item
+    return None
+
+
 class BodyGetter(AbstractInjector):
     """
     Validates and injects the content of request body inside the view kwargs.
@@ -59,18 +337,342 @@ class BodyGetter(AbstractInjector):
 
     context = "body"
 
-    def __init__(self, args_spec: dict, default_values: dict):
-        self.arg_name, self.model = next(iter(args_spec.items()))
+    def __init__(
+        self, args_spec: dict, default_values: dict, codec: Optional[Codec] = None
+    ):
+        self.arg_name, annotation = next(iter(args_spec.items()))
+        self.model, self.constraints = get_body_constraints(annotation)
+        self.codec = codec
 
     async def inject(self, request: BaseRequest, args_view: list, kwargs_view: dict):
+        _check_content_encoding(request)
+        codec = get_request_codec(request, self.codec)
+        if self.constraints is None:
+            raw_body = await request.read()
+        else:
+            raw_body = await self.constraints.read(request)
         try:
-            body = await request.json()
-        except JSONDecodeError:
+            body = codec.loads(raw_body)
+        except ValueError:
+            raise _malformed_json() from None
+
+        if self.constraints is not None:
+            self.constraints.check_structure(body)
+        kwargs_view[self.arg_name] = self.model.parse_obj(body)
+
+
+class FormGetter(AbstractInjector):
+    """
+    Validates and injects the fields of an urlencoded or multipart/form-data
+    body inside the view kwargs. The files of a multipart body are read
+    into UploadFile without being kept in memory. The max_items constraint
+    limits the number of fields.
+    """
+
+    context = "body"
+
+    def __init__(
+        self, args_spec: dict, default_values: dict, codec: Optional[Codec] = None
+    ):
+        self.arg_name, annotation = next(iter(args_spec.items()))
+        self.model, self.constraints = get_body_constraints(annotation)
+        self.form = get_form(annotation) or Form()
+        if self.constraints is not None and (
+            self.constraints.max_depth is not None
+            or self.constraints.max_item_bytes is not None
+        ):
+            raise RuntimeError(
+                f"The form {self.arg_name} does not support the max_depth and"
+                " max_item_bytes constraints, use Form(max_field_size=...) to"
+                " limit the size of the fields"
+            )
+        self._list_names = _list_names(
+            {field.alias: field.outer_type_ for field in self.model.__fields__.values()}
+        )
+
+    async def inject(self, request: BaseRequest, args_view: list, kwargs_view: dict):
+        _check_content_encoding(request)
+        max_bytes = max_items = None
+        if self.constraints is not None:
+            self.constraints.check_content_type(request)
+            self.constraints.check_content_length(request)
+            max_bytes = self.constraints.max_bytes
+            max_items = self.constraints.max_items
+
+        try:
+            if request.content_type == MULTIPART_CONTENT_TYPE:
+                fields = await read_multipart(request, self.form, max_bytes, max_items)
+            elif request.content_type == URLENCODED_CONTENT_TYPE:
+                if self.constraints is None:
+                    raw_body = await request.read()
+                else:
+                    raw_body = await self.constraints.read(request)
+                fields = MultiDict(
+                    parse_qsl(
+                        raw_body.decode(request.charset or "utf-8"),
+                        keep_blank_values=True,
+                    )
+                )
+                if max_items is not None and len(fields) > max_items:
+                    raise FieldTooLarge("Too many items in body")
+            else:
+                raise _unsupported_content_type(FORM_CONTENT_TYPES)
+        except FieldTooLarge as error:
+            raise _body_too_large(str(error)) from None
+        except ValueError:
             raise HTTPBadRequest(
-                text='{"error": "Malformed JSON"}', content_type="application/json"
+                text='{"error": "Malformed form"}', content_type="application/json"
             ) from None
 
-        kwargs_view[self.arg_name] = self.model(**body)
+        values = {
+            name: fields.getall(name) if name in self._list_names else fields[name]
+            for name in fields
+        }
+        try:
+            kwargs_view[self.arg_name] = self.model.parse_obj(values)
+        except ValidationError:
+            close_files(fields)
+            raise
+
+
+class BodyStreamValidationError(ValidationError):
+    """
+    Raised while the view iterates over a streamed body containing an
+    invalid item. The location of errors starts with the item index.
+    """
+
+
+class BodyStreamGetter(AbstractInjector):
+    """
+    Injects an async iterator inside the view kwargs. The iterator validates
+    and yields the items of the request body one by one, the body can be
+    a JSON array or a newline delimited JSON (NDJSON).
+    """
+
+    context = "body"
+
+    def __init__(
+        self, args_spec: dict, default_values: dict, codec: Optional[Codec] = None
+    ):
+        self.arg_name, annotation = next(iter(args_spec.items()))
+        stream_type, self.constraints = get_body_constraints(annotation)
+        self.model = get_stream_model(stream_type)
+        self.codec = codec
+
+    async def inject(self, request: BaseRequest, args_view: list, kwargs_view: dict):
+        _check_content_encoding(request)
+        if self.constraints is not None:
+            self.constraints.check_content_type(request)
+            self.constraints.check_content_length(request)
+        kwargs_view[self.arg_name] = self._iter_models(request)
+
+    async def _iter_models(self, request: BaseRequest) -> AsyncIterator[BaseModel]:
+        chunks = request.content.iter_any()
+        max_item_size = _client_max_size(request)
+        if self.constraints is not None:
+            chunks = self.constraints.limit_size(chunks)
+            if self.constraints.max_item_bytes is not None:
+                max_item_size = self.constraints.max_item_bytes
+
+        if request.content_type in NDJSON_CONTENT_TYPES:
+            loads = get_codec(request, self.codec).loads
+            items = _iter_ndjson(chunks, loads, max_item_size)
+        else:
+            items = _iter_json_array(chunks, max_item_size)
+
+        index = 0
+        async for item in items:
+            if self.constraints is not None:
+                if self.constraints.max_items is not None:
+                    if index >= self.constraints.max_items:
+                        raise _body_too_large("Too many items in body")
+                self.constraints.check_structure(item)
+            try:
+                yield self.model.parse_obj(item)
+            except ValidationError as error:
+                raise BodyStreamValidationError(
+                    [ErrorWrapper(error, loc=index)], self.model
+                ) from None
+            index += 1
+
+
+def _client_max_size(request: BaseRequest) -> int:
+    try:
+        return request.client_max_size
+    except AttributeError:  # older aiohttp versions
+        return request._client_max_size
+
+
+def _malformed_json() -> HTTPBadRequest:
+    return HTTPBadRequest(
+        text='{"error": "Malformed JSON"}', content_type="application/json"
+    )
+
+
+async def _iter_ndjson(
+    chunks: AsyncIterator[bytes], loads: Callable[[bytes], Any], max_item_size: int
+) -> AsyncIterator[Any]:
+    """
+    Yields the decoded lines of a newline delimited JSON stream. The newlines
+    are searched in the new chunks only, a line larger than max_item_size is
+    rejected with the status 413.
+    """
+    line = bytearray()
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            if line:
+                line += memoryview(chunk)[start:end]
+                segment, line = bytes(line), bytearray()
+            else:
+                segment = chunk[start:end]
+            start = end + 1
+            if len(segment) > max_item_size:
+                raise _body_too_large("Item too large")
+            if segment.strip():
+                yield _loads_line(loads, segment)
+
+        line += memoryview(chunk)[start:]
+        if len(line) > max_item_size:
+            raise _body_too_large("Item too large")
+
+    if line.strip():
+        yield _loads_line(loads, bytes(line))
+
+
+def _loads_line(loads: Callable[[bytes], Any], line: bytes) -> Any:
+    try:
+        return loads(line)
+    except ValueError:
+        raise _malformed_json() from None
+
+
+_json_decoder = json.JSONDecoder()
+_skip_whitespaces = re.compile(r"[ \t\n\r]*").match
+_find_structural_chars = re.compile(r'[\\"{}\[\]]').finditer
+_find_scalar_end = re.compile(r"[ \t\n\r,\]}]").search
+
+
+class _ItemEndScanner:
+    """
+    Tells if the end of a JSON value read chunk after chunk may be in the
+    last chunk. Each character is scanned once.
+    """
+
+    def __init__(self, first_char: str):
+        self.scalar = first_char not in '{["'
+        self.depth = 0
+        self.in_string = False
+        self.escaped_position: Optional[int] = None
+
+    def feed(self, text: str, start: int = 0) -> bool:
+        if self.scalar:
+            return _find_scalar_end(text, start) is not None
+
+        escaped_position, self.escaped_position = self.escaped_position, None
+        for match in _find_structural_chars(text, start):
+            position = match.start()
+            if position == escaped_position:
+                continue
+            char = match.group()
+            if self.in_string:
+                if char == "\\":
+                    escaped_position = position + 1
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 0:
+                        return True
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+
+        if escaped_position == len(text):
+            self.escaped_position = 0
+        return False
+
+
+async def _iter_json_array(
+    chunks: AsyncIterator[bytes], max_item_size: int
+) -> AsyncIterator[Any]:
+    """
+    Yields the decoded items of a JSON array while the stream is read.
+    Only the item being decoded is buffered, it is decoded once its end
+    has been read. An item larger than max_item_size is rejected with the
+    status 413.
+    """
+    text_decoder = getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    eof = False
+
+    async def read_more() -> str:
+        nonlocal eof
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            eof = True
+            chunk = b""
+        try:
+            return text_decoder.decode(chunk, final=eof)
+        except UnicodeDecodeError:
+            raise _malformed_json() from None
+
+    async def next_token() -> str:
+        """
+        Skip the whitespaces and return the next character without consuming it.
+        """
+        nonlocal buffer, position
+        position = _skip_whitespaces(buffer, position).end()
+        while position == len(buffer):
+            if eof:
+                raise _malformed_json()
+            buffer = await read_more()
+            position = _skip_whitespaces(buffer).end()
+        return buffer[position]
+
+    if await next_token() != "[":
+        raise _malformed_json()
+    position += 1
+
+    if await next_token() == "]":
+        return
+
+    while True:
+        scanner = _ItemEndScanner(await next_token())
+        if not scanner.feed(buffer, position):
+            pieces = [buffer[position:]]
+            size = len(pieces[0])
+            may_end = False
+            while not may_end and not eof:
+                if size > max_item_size:
+                    raise _body_too_large("Item too large")
+                text = await read_more()
+                pieces.append(text)
+                size += len(text)
+                may_end = scanner.feed(text)
+            buffer = "".join(pieces)
+            position = 0
+
+        try:
+            item, end = _json_decoder.raw_decode(buffer, position)
+        except ValueError:
+            raise _malformed_json() from None
+        if end - position > max_item_size:
+            raise _body_too_large("Item too large")
+        position = end
+        yield item
+
+        token = await next_token()
+        position += 1
+        if token == "]":
+            return
+        if token != ",":
+            raise _malformed_json()
 
 
 class QueryGetter(AbstractInjector):
@@ -81,13 +683,48 @@ class QueryGetter(AbstractInjector):
     context = "query string"
 
     def __init__(self, args_spec: dict, default_values: dict):
-        attrs = {"__annotations__": args_spec}
+        attrs = {"__annotations__": dict(args_spec)}
         attrs.update(default_values)
         self.model = type("QueryModel", (BaseModel,), attrs)
+        self._names = frozenset(args_spec)
+        self._list_names = _list_names(args_spec)
 
     def inject(self, request: BaseRequest, args_view: list, kwargs_view: dict):
-        unique_query = {q: ','.join(request.query.getall(q)) for q in request.query}
-        kwargs_view.update(dict(self.model(**unique_query)))
+        query = _get_query(request.query, self._names, self._list_names)
+        kwargs_view.update(dict(self.model(**query)))
+
+
+def _list_names(args_spec: dict) -> frozenset:
+    """
+    Returns the name of arguments annotated with a list, a set or a tuple,
+    optional or not.
+    """
+    names = set()
+    for name, type_ in args_spec.items():
+        if typing.get_origin(type_) is Union:
+            args = [arg for arg in typing.get_args(type_) if arg is not type(None)]
+            if len(args) == 1:
+                type_ = args[0]
+        if (typing.get_origin(type_) or type_) in (list, set, frozenset, tuple):
+            names.add(name)
+    return frozenset(names)
+
+
+def _get_query(query: MultiMapping[str], names: frozenset, list_names: frozenset):
+    """
+    Returns the values of declared arguments reading the query string once.
+    All the values of a repeated key are kept in a list for the arguments
+    annotated with a list, else they are joined with a comma.
+    """
+    values = {}
+    for key, value in query.items():
+        if key in names:
+            values.setdefault(key, []).append(value)
+
+    for name, name_values in values.items():
+        if name not in list_names:
+            values[name] = ",".join(name_values)
+    return values
 
 
 class HeadersGetter(AbstractInjector):
@@ -98,25 +735,122 @@ class HeadersGetter(AbstractInjector):
     context = "headers"
 
     def __init__(self, args_spec: dict, default_values: dict):
-        attrs = {"__annotations__": args_spec}
+        attrs = {"__annotations__": dict(args_spec)}
         attrs.update(default_values)
         self.model = type("HeaderModel", (BaseModel,), attrs)
+        self._header_names = _header_names(args_spec)
 
     def inject(self, request: BaseRequest, args_view: list, kwargs_view: dict):
-        header = {k.lower().replace("-", "_"): v for k, v in request.headers.items()}
+        header = _get_headers(request.headers, self._header_names)
         kwargs_view.update(self.model(**header).dict())
 
 
-def _parse_func_signature(func: Callable) -> Tuple[dict, dict, dict, dict, dict]:
+def _header_names(args_spec: dict) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """
+    Returns the names of HTTP headers which can set each argument.
+    The argument x_request_id can be set by the header X-Request-Id or
+    x_request_id.
+    """
+    return tuple(
+        (name, tuple(dict.fromkeys((name, name.replace("_", "-")))))
+        for name in args_spec
+    )
+
+
+def _get_headers(headers: Mapping[str, str], header_names) -> dict:
+    """
+    Returns the values of the declared headers only. The lookup of
+    request.headers is case-insensitive.
     """
-    Analyse function signature and returns 4-tuple:
+    values = {}
+    for name, wire_names in header_names:
+        for wire_name in wire_names:
+            if wire_name in headers:
+                values[name] = headers[wire_name]
+                break
+    return values
+
+
+class RequestGetter(AbstractInjector):
+    """
+    Validates the URL path, the query string and the HTTP headers using a
+    single model and injects them inside the view args and kwargs.
+    """
+
+    context = "request"
+
+    def __init__(
+        self, path_args: dict, qs_args: dict, header_args: dict, default_values: dict
+    ):
+        attrs = {"__annotations__": {**path_args, **qs_args, **header_args}}
+        attrs.update(default_values)
+        self.model = type("RequestModel", (BaseModel,), attrs)
+        self._path_names = tuple(path_args)
+        self._qs_names = frozenset(qs_args)
+        self._qs_list_names = _list_names(qs_args)
+        self._header_names = _header_names(header_args)
+        self._contexts = dict.fromkeys(path_args, MatchInfoGetter.context)
+        self._contexts.update(dict.fromkeys(qs_args, QueryGetter.context))
+        self._contexts.update(dict.fromkeys(header_args, HeadersGetter.context))
+
+    def inject(self, request: BaseRequest, args_view: list, kwargs_view: dict):
+        values = {}
+        match_info = request.match_info
+        for name in self._path_names:
+            if name in match_info:
+                values[name] = match_info[name]
+
+        values.update(_get_query(request.query, self._qs_names, self._qs_list_names))
+
+        values.update(_get_headers(request.headers, self._header_names))
+        values = dict(self.model(**values))
+        args_view.extend(values.pop(name) for name in self._path_names)
+        kwargs_view.update(values)
+
+    def error_location(self, error: dict) -> str:
+        return self._contexts.get(error["loc"][0], self.context)
+
+
+class HandlerSignature(NamedTuple):
+    """
+    The arguments of a handler grouped by where their values are read.
+    """
+
+    path_args: Mapping[str, Any]
+    body_args: Mapping[str, Any]
+    qs_args: Mapping[str, Any]
+    header_args: Mapping[str, Any]
+    defaults: Mapping[str, Any]
+
+
+_handler_signatures: "WeakKeyDictionary[Callable, HandlerSignature]"
+_handler_signatures = WeakKeyDictionary()
+
+
+def _parse_func_signature(func: Callable) -> HandlerSignature:
+    """
+    Analyse function signature and returns 5-tuple:
         0 - arguments will be set from the url path
         1 - argument will be set from the request body.
         2 - argument will be set from the query string.
         3 - argument will be set from the HTTP headers.
         4 - Default value for each parameters
-    """
 
+    The result is read only and cached, a handler decorated using
+    functools.wraps shares the result of the function it wraps.
+    """
+    func = unwrap(func, stop=lambda f: hasattr(f, "__signature__"))
+    try:
+        return _handler_signatures[func]
+    except KeyError:
+        handler_signature = _analyse_func_signature(func)
+        _handler_signatures[func] = handler_signature
+        return handler_signature
+    except TypeError:  # func cannot be weakly referenced.
+        return _analyse_func_signature(func)
+
+
+def _analyse_func_signature(func: Callable) -> HandlerSignature:
     path_args = {}
     body_args = {}
     qs_args = {}
@@ -137,7 +871,11 @@ def _parse_func_signature(func: Callable) -> Tuple[dict, dict, dict, dict, dict]
             path_args[param_name] = param_spec.annotation
 
         elif param_spec.kind is param_spec.POSITIONAL_OR_KEYWORD:
-            if is_pydantic_base_model(param_spec.annotation):
+            body_type, _ = get_body_constraints(param_spec.annotation)
+            if (
+                is_pydantic_base_model(body_type)
+                or get_stream_model(body_type) is not None
+            ):
                 body_args[param_name] = param_spec.annotation
             else:
                 qs_args[param_name] = param_spec.annotation
@@ -146,4 +884,10 @@ def _parse_func_signature(func: Callable) -> Tuple[dict, dict, dict, dict, dict]
         else:
             raise RuntimeError(f"You cannot use {param_spec.VAR_POSITIONAL} parameters")
 
-    return path_args, body_args, qs_args, header_args, defaults
+    return HandlerSignature(
+        MappingProxyType(path_args),
+        MappingProxyType(body_args),
+        MappingProxyType(qs_args),
+        MappingProxyType(header_args),
+        MappingProxyType(defaults),
+    )
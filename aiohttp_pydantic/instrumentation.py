@@ -0,0 +1,232 @@
+"""
+Measure where the time of the PydanticView handlers goes.
+
+Set an Instrumentation on a PydanticView class to receive the time spent to
+read the request body, the time spent by each injector to parse and validate
+the request, the time spent by the handler, the size of the request body and
+the validation failures. The handlers of the views without instrumentation
+do not run any instrumentation code.
+
+PrometheusInstrumentation aggregates the measures in memory and renders them
+using the Prometheus text format:
+
+    from aiohttp_pydantic.instrumentation import PrometheusInstrumentation
+
+    instrumentation = PrometheusInstrumentation()
+
+    class ArticleView(PydanticView):
+        instrumentation = instrumentation
+
+    app.router.add_get("/metrics", instrumentation.handler)
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+from aiohttp.web import Response
+from aiohttp.web_request import BaseRequest
+
+DURATION_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+SIZE_BUCKETS = tuple(4**exponent for exponent in range(4, 13))
+
+
+class Instrumentation:
+    """
+    Receives the measures of the PydanticView handlers, the methods do nothing.
+    handler is the qualified name of the handler, for instance "ArticleView.get"
+    and location is where the injector reads its values, for instance "body".
+
+    on_body_read is called only for the bodies read at once before being
+    decoded, the body argument annotated with a model. The streamed bodies,
+    the forms and the bodies annotated with BodyConstraints are read while
+    they are validated: their read time is part of the "body" injection time
+    and their size is not reported.
+    """
+
+    def on_body_read(self, handler: str, duration_ns: int, size: int):
+        """
+        Called when the request body is read, before being decoded.
+        """
+
+    def on_inject(self, handler: str, location: str, duration_ns: int):
+        """
+        Called after an injector parsed and validated the request.
+        """
+
+    def on_validation_failure(self, handler: str, location: str):
+        """
+        Called when the request is rejected because of invalid values.
+        """
+
+    def on_handler(self, handler: str, duration_ns: int):
+        """
+        Called when the handler returns. For an async generator handler, it is
+        called when the iteration over its items ends and duration_ns includes
+        the time spent to write the items.
+        """
+
+
+class _Histogram:
+    """
+    A Prometheus histogram by label values.
+    """
+
+    def __init__(self, name: str, help_: str, labels: Tuple[str, ...], buckets):
+        self.name = name
+        self.help = help_
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in self._series.items():
+            labels = _format_labels(self.labels, label_values)
+            cumulated = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulated += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulated}'
+                )
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class _Counter:
+    """
+    A Prometheus counter by label values.
+    """
+
+    def __init__(self, name: str, help_: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help_
+        self.labels = labels
+        self._series: Dict[Tuple[str, ...], int] = {}
+
+    def inc(self, label_values: Tuple[str, ...]):
+        self._series[label_values] = self._series.get(label_values, 0) + 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, count in self._series.items():
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}{{{labels}}} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Aggregate the measures in memory and render them using the Prometheus
+    text exposition format.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(
+        self,
+        prefix: str = "aiohttp_pydantic",
+        duration_buckets: Sequence[float] = DURATION_BUCKETS,
+        size_buckets: Sequence[int] = SIZE_BUCKETS,
+    ):
+        self._body_read = _Histogram(
+            f"{prefix}_body_read_seconds",
+            "Time spent to read the request body.",
+            ("handler",),
+            duration_buckets,
+        )
+        self._body_size = _Histogram(
+            f"{prefix}_body_size_bytes",
+            "Size of the request body.",
+            ("handler",),
+            size_buckets,
+        )
+        self._inject = _Histogram(
+            f"{prefix}_inject_seconds",
+            "Time spent to parse and validate the request by location.",
+            ("handler", "location"),
+            duration_buckets,
+        )
+        self._failures = _Counter(
+            f"{prefix}_validation_failures_total",
+            "Number of requests rejected because of invalid values.",
+            ("handler", "location"),
+        )
+        self._handler = _Histogram(
+            f"{prefix}_handler_seconds",
+            "Time spent in the handler.",
+            ("handler",),
+            duration_buckets,
+        )
+
+    def on_body_read(self, handler: str, duration_ns: int, size: int):
+        self._body_read.observe((handler,), duration_ns / 1e9)
+        self._body_size.observe((handler,), size)
+
+    def on_inject(self, handler: str, location: str, duration_ns: int):
+        self._inject.observe((handler, location), duration_ns / 1e9)
+
+    def on_validation_failure(self, handler: str, location: str):
+        self._failures.inc((handler, location))
+
+    def on_handler(self, handler: str, duration_ns: int):
+        self._handler.observe((handler,), duration_ns / 1e9)
+
+    def render(self) -> str:
+        """
+        Returns the metrics using the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in (
+            self._body_read,
+            self._body_size,
+            self._inject,
+            self._failures,
+            self._handler,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def handler(self, request: BaseRequest) -> Response:
+        """
+        aiohttp handler serving the metrics.
+        """
+        return Response(
+            body=self.render().encode(),
+            headers={"Content-Type": self.CONTENT_TYPE},
+        )
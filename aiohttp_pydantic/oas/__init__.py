@@ -1,11 +1,6 @@
-from importlib import resources
 from typing import Iterable
 
-import jinja2
 from aiohttp import web
-from swagger_ui_bundle import swagger_ui_path
-
-from .view import get_oas, oas_ui
 
 
 def setup(
@@ -15,13 +10,17 @@ def setup(
     enable: bool = True,
 ):
     if enable:
+        # Imported here to not load the OAS generator when it is disabled.
+        from .view import _IndexTemplate, _SpecCache, get_oas, oas_static, oas_ui
+
         oas_app = web.Application()
         oas_app["apps to expose"] = tuple(apps_to_expose) or (app,)
-        oas_app["index template"] = jinja2.Template(
-            resources.read_text("aiohttp_pydantic.oas", "index.j2")
-        )
+        oas_app["spec cache"] = _SpecCache(oas_app["apps to expose"])
+        oas_app["index template"] = _IndexTemplate()
         oas_app.router.add_get("/spec", get_oas, name="spec")
-        oas_app.router.add_static("/static", swagger_ui_path, name="static")
+        oas_app.router.add_get(
+            "/static/{version}/{filename:.*}", oas_static, name="static"
+        )
         oas_app.router.add_get("", oas_ui, name="index")
 
         app.add_subapp(url_prefix, oas_app)
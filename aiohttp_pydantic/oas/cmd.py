@@ -1,8 +1,14 @@
 import argparse
 import importlib
 import json
-from typing import Dict, Protocol, Optional, Callable
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Protocol, Optional, Callable
 import sys
+
+from aiohttp import web
+
 from .view import generate_oas
 
 
@@ -11,7 +17,7 @@ class YamlModule(Protocol):
     Yaml Module type hint
     """
 
-    def dump(self, data) -> str:
+    def dump(self, data, default_flow_style: bool = False) -> str:
         pass
 
 
@@ -57,13 +63,23 @@ def base_oas_file_type(value) -> Dict:
     return json.loads(data)
 
 
+def _json_dump(data, compact: bool = False) -> str:
+    if compact:
+        return json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return json.dumps(data, sort_keys=True, indent=4)
+
+
+def _yaml_dump(data, compact: bool = False) -> str:
+    return yaml.dump(data, default_flow_style=compact)
+
+
 def format_type(value) -> Callable:
     """
     Date Dumper one of (json, yaml)
     """
-    dumpers = {"json": lambda data: json.dumps(data, sort_keys=True, indent=4)}
+    dumpers = {"json": _json_dump}
     if yaml is not None:
-        dumpers["yaml"] = yaml.dump
+        dumpers["yaml"] = _yaml_dump
 
     try:
         return dumpers[value]
@@ -120,14 +136,85 @@ def setup(parser: argparse.ArgumentParser):
         help=help_output_format,
         default=format_type("json"),
     )
+    parser.add_argument(
+        "-c",
+        "--compact",
+        action="store_true",
+        help="Write the output without indentation",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="Generate the OAS of each APP in a pool of N processes"
+        " (0 means the number of CPUs). The specifications are merged in the"
+        " order of APP arguments.",
+    )
 
     parser.set_defaults(func=show_oas)
 
 
+def merge_specs(specs: List[Dict]) -> Dict:
+    """
+    Merge the specifications in order, the nested dicts are merged and the
+    other values of a specification replace the values of the previous ones.
+    """
+    merged: Dict = {}
+    for spec in specs:
+        _merge_dict(merged, spec)
+    return merged
+
+
+def _merge_dict(target: Dict, source: Dict):
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_dict(target[key], value)
+        elif isinstance(value, dict):
+            target[key] = {}
+            _merge_dict(target[key], value)
+        else:
+            target[key] = value
+
+
+# The applications are inherited by the forked processes of the pool
+# because applications cannot be pickled.
+_apps_to_generate: List[web.Application] = []
+
+
+def _generate_app_oas(index: int) -> Dict:
+    return generate_oas([_apps_to_generate[index]])
+
+
+def generate_oas_in_parallel(apps: List[web.Application], jobs: int) -> Dict:
+    """
+    Generate the Open Api Specification of each application in a pool of
+    jobs processes and merge them in the order of apps. The specification is
+    generated in the current process if jobs is 1 or if the platform cannot
+    fork.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        jobs = 1
+    jobs = min(jobs or os.cpu_count() or 1, len(apps))
+    if jobs <= 1:
+        return generate_oas(apps)
+
+    _apps_to_generate[:] = apps
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            specs = list(executor.map(_generate_app_oas, range(len(apps))))
+    finally:
+        _apps_to_generate.clear()
+    return merge_specs(specs)
+
+
 def show_oas(args: argparse.Namespace):
     """
     Display Open API Specification on the stdout.
     """
     spec = args.base
-    spec.update(generate_oas(args.apps))
-    print(args.formatter(spec), file=args.output)
+    spec.update(generate_oas_in_parallel(args.apps, args.jobs))
+    print(args.formatter(spec, compact=args.compact), file=args.output)
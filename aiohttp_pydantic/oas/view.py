@@ -1,20 +1,34 @@
+import gzip
+import hashlib
 import typing
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from importlib import resources
 from inspect import getdoc
 from itertools import count
+from pathlib import Path
 from typing import List, Type
 
-from aiohttp.web import Response, json_response
+from aiohttp.web import FileResponse, HTTPNotFound, Response
 from aiohttp.web_app import Application
 from pydantic import BaseModel
 
 from aiohttp_pydantic.oas.struct import OpenApiSpec3, OperationObject, PathItem
 from . import docstring_parser
 
-from ..injectors import _parse_func_signature
-from ..utils import is_pydantic_base_model
+from ..codec import get_codec, registered_codecs
+from ..form import FORM_CONTENT_TYPES, MULTIPART_CONTENT_TYPE, UploadFile
+from ..injectors import _parse_func_signature, get_body_constraints, get_form
+from ..response import NDJSON_CONTENT_TYPE
+from ..utils import get_stream_model, is_pydantic_base_model
 from ..view import PydanticView, is_pydantic_view
 from .typing import is_status_code_type
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 
 def _handle_optional(type_):
     """
@@ -39,6 +53,60 @@ def _get_pydantic_schema(model) -> dict:
     return dict(schema)  # Create a copy to avoid cached schema mutations
 
 
+_NO_DEFAULT = object()
+
+
+class _SchemaCache:
+    """
+    Schemas computed during one generation of the Open Api Specification.
+    The models and the parameter types shared by several operations are
+    processed once.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._parameters = {}
+
+    def model_schema(self, model) -> typing.Tuple[dict, dict]:
+        """
+        Returns a copy of the schema of model without its definitions, and the
+        definitions.
+        """
+        try:
+            schema, definitions = self._models[model]
+        except KeyError:
+            schema = _get_pydantic_schema(model)
+            definitions = schema.pop("definitions", None) or {}
+            self._models[model] = schema, definitions
+        return dict(schema), definitions
+
+    def parameter_schema(
+        self, name: str, type_, default=_NO_DEFAULT
+    ) -> typing.Tuple[dict, dict]:
+        """
+        Returns the schema of a parameter and the definitions it uses.
+        """
+        # The type of default is part of the key because 1 == 1.0 == True.
+        key = (name, type_, type(default), default)
+        try:
+            param_model = self._parameters.get(key)
+        except TypeError:  # Unhashable type or default value.
+            key = None
+            param_model = None
+
+        if param_model is None:
+            attrs = {"__annotations__": {"__root__": type_}}
+            if default is not _NO_DEFAULT:
+                attrs["__root__"] = default
+            param_model = type(name, (BaseModel,), attrs)
+            if key is None:
+                schema = _get_pydantic_schema(param_model)
+                return schema, schema.pop("definitions", None) or {}
+            self._parameters[key] = param_model
+
+        return self.model_schema(param_model)
+
+
 def _make_ref(model_name: str) -> str:
     return SCHEMA_REF_TEMPLATE.format(model=model_name)
 
@@ -53,16 +121,26 @@ class _OASResponseBuilder:
     generate the OAS operation response.
     """
 
-    def __init__(self, oas: OpenApiSpec3, oas_operation, status_code_descriptions, auth_provider_cfg):
+    def __init__(
+        self,
+        oas: OpenApiSpec3,
+        oas_operation,
+        status_code_descriptions,
+        auth_provider_cfg,
+        schemas: typing.Optional[_SchemaCache] = None,
+        media_types: typing.Iterable[str] = (),
+    ):
         self._oas_operation = oas_operation
         self._oas = oas
         self._status_code_descriptions = status_code_descriptions
         self._auth_provider_cfg = auth_provider_cfg
+        self._schemas = _SchemaCache() if schemas is None else schemas
+        self._media_types = tuple(media_types)
 
     def _handle_pydantic_base_model(self, obj):
         if is_pydantic_base_model(obj):
-            response_schema = _get_pydantic_schema(obj)
-            if def_sub_schemas := response_schema.pop("definitions", None):
+            response_schema, def_sub_schemas = self._schemas.model_schema(obj)
+            if def_sub_schemas:
                 self._oas.components.schemas.update(def_sub_schemas)
 
             model_name = response_schema['title']
@@ -71,7 +149,7 @@ class _OASResponseBuilder:
         return {}
 
     def _handle_list(self, obj):
-        if typing.get_origin(obj) is list:
+        if typing.get_origin(obj) in (list, AsyncIterator):
             return {
                 "type": "array",
                 "items": self._handle_pydantic_base_model(typing.get_args(obj)[0]),
@@ -82,11 +160,19 @@ class _OASResponseBuilder:
         status_code = None
         if is_status_code_type(typing.get_origin(obj)):
             status_code = typing.get_origin(obj).__name__[1:]
-            self._oas_operation.responses[status_code].content = {
-                "application/json": {
-                    "schema": self._handle_list(typing.get_args(obj)[0])
+            content_type = typing.get_args(obj)[0]
+            content = {"application/json": {"schema": self._handle_list(content_type)}}
+            if typing.get_origin(content_type) is AsyncIterator:
+                content[NDJSON_CONTENT_TYPE] = {
+                    "schema": self._handle_pydantic_base_model(
+                        typing.get_args(content_type)[0]
+                    )
                 }
-            }
+            else:
+                schema = content["application/json"]["schema"]
+                for media_type in self._media_types:
+                    content[media_type] = {"schema": schema}
+            self._oas_operation.responses[status_code].content = content
             desc = self._status_code_descriptions.get(int(status_code))
             if desc:
                 self._oas_operation.responses[status_code].description = desc
@@ -142,13 +228,35 @@ def _add_auth(oas: OpenApiSpec3, oas_operation: OperationObject, auth_cfg):
     oas_operation.security['cookieAuth']
 
 
+def _form_content_types(model) -> typing.Tuple[str, ...]:
+    """
+    Returns the content types of a form, a form with files is multipart only.
+    """
+    for field in model.__fields__.values():
+        if isinstance(field.type_, type) and issubclass(field.type_, UploadFile):
+            return (MULTIPART_CONTENT_TYPE,)
+    return FORM_CONTENT_TYPES
+
+
 def _add_http_method_to_oas(
-    oas: OpenApiSpec3, oas_path: PathItem, http_method: str, view: Type[PydanticView]
+    oas: OpenApiSpec3,
+    oas_path: PathItem,
+    http_method: str,
+    view: Type[PydanticView],
+    schemas: typing.Optional[_SchemaCache] = None,
+    media_types: typing.Iterable[str] = (),
 ):
+    """
+    Document a handler of view. media_types are the content types of the
+    registered codecs, documented next to application/json.
+    """
     http_method = http_method.lower()
     if http_method == 'options':
         return
 
+    if schemas is None:
+        schemas = _SchemaCache()
+
     oas_operation: OperationObject = getattr(oas_path, http_method)
     handler = getattr(view, http_method)
     path_args, body_args, qs_args, header_args, defaults = _parse_func_signature(
@@ -171,14 +279,30 @@ def _add_http_method_to_oas(
         _add_auth(oas, oas_operation, auth_cfg)
 
     if body_args:
-        body_model = next(iter(body_args.values()))
-        body_schema = _get_pydantic_schema(body_model)
-        if def_sub_schemas := body_schema.pop("definitions", None):
+        body_annotation = next(iter(body_args.values()))
+        body_model, constraints = get_body_constraints(body_annotation)
+        stream_model = get_stream_model(body_model)
+        body_schema, def_sub_schemas = schemas.model_schema(stream_model or body_model)
+        if def_sub_schemas:
             oas.components.schemas.update(def_sub_schemas)
 
-        oas_operation.request_body.content = {
-            "application/json": {"schema": body_schema}
-        }
+        if stream_model is None:
+            if constraints is not None and constraints.content_types is not None:
+                content_types = constraints.content_types
+            elif get_form(body_annotation) is not None:
+                content_types = _form_content_types(body_model)
+            else:
+                content_types = ("application/json", *media_types)
+            oas_operation.request_body.content = {
+                content_type: {"schema": body_schema} for content_type in content_types
+            }
+        else:
+            oas_operation.request_body.content = {
+                "application/json": {
+                    "schema": {"type": "array", "items": body_schema}
+                },
+                "application/x-ndjson": {"schema": body_schema},
+            }
 
     indexes = count()
     for args_location, args in (
@@ -192,15 +316,11 @@ def _add_http_method_to_oas(
             oas_operation.parameters[i].name = name
             optional_type = _handle_optional(type_)
 
-            attrs = {"__annotations__": {"__root__": type_}}
-            if name in defaults:
-                attrs["__root__"] = defaults[name]
-
-            param_model = type(name, (BaseModel,), attrs)
-            param_schema = _get_pydantic_schema(param_model)
+            param_schema, def_sub_schemas = schemas.parameter_schema(
+                name, type_, defaults.get(name, _NO_DEFAULT)
+            )
             oas_operation.parameters[i].schema = param_schema
-
-            if def_sub_schemas := param_schema.pop("definitions", None):
+            if def_sub_schemas:
                 oas.components.schemas.update(def_sub_schemas)
 
             oas_operation.parameters[i].required = optional_type is None
@@ -208,40 +328,303 @@ def _add_http_method_to_oas(
     auth_provider_cfg = getattr(handler, '__auth_provider__', None)
     return_type = handler.__annotations__.get("return")
     if return_type is not None:
-        _OASResponseBuilder(oas, oas_operation, status_code_descriptions, auth_provider_cfg).build(
-            return_type
-        )
+        _OASResponseBuilder(
+            oas,
+            oas_operation,
+            status_code_descriptions,
+            auth_provider_cfg,
+            schemas,
+            media_types,
+        ).build(return_type)
+
+
+def _app_chains(
+    roots: typing.Iterable[Application],
+) -> typing.Dict[int, typing.Tuple[Application, ...]]:
+    """
+    Returns the applications from a root to each application reachable from
+    roots through the sub-applications, by application id. A root which is
+    the sub-application of another root gets the longest chain.
+    """
+    chains = {}
+    stack = [(root, (root,)) for root in roots]
+    while stack:
+        app, chain = stack.pop()
+        if len(chains.get(id(app), ())) >= len(chain):
+            continue
+        chains[id(app)] = chain
+        for resource in app.router.resources():
+            sub_app = resource.get_info().get("app")
+            if sub_app is not None:
+                stack.append((sub_app, chain + (sub_app,)))
+    return chains
+
+
+class _OASBuilder:
+    """
+    Keep the Open Api Specification of the PydanticView of apps up to date.
+
+    update() only documents the routes added since the previous update and
+    the routes whose view changed. The routers of started applications are
+    frozen, once all routers are frozen the routes are not scanned anymore.
+    """
+
+    def __init__(self, apps: typing.Iterable[Application]):
+        self._apps = apps
+        self._oas = OpenApiSpec3()
+        self._schemas = _SchemaCache()
+        self._documented: typing.Dict[typing.Tuple[str, str], type] = {}
+        self._media_types: typing.Tuple[str, ...] = ()
+        self._frozen_apps: typing.Optional[typing.Tuple[int, ...]] = None
+
+    @property
+    def spec(self) -> dict:
+        return self._oas.spec
+
+    def _routes(self) -> typing.Dict[typing.Tuple[str, str], type]:
+        """
+        Returns the PydanticView of apps by (path, http method).
+        """
+        routes = {}
+        for app in self._apps:
+            for resources in app.router.resources():
+                for resource_route in resources:
+                    if not is_pydantic_view(resource_route.handler):
+                        continue
+
+                    view: Type[PydanticView] = resource_route.handler
+                    info = resource_route.get_info()
+                    path = info.get("path", info.get("formatter"))
+                    if resource_route.method == "*":
+                        for method_name in view.allowed_methods:
+                            routes[(path, method_name.lower())] = view
+                    else:
+                        routes[(path, resource_route.method.lower())] = view
+        return routes
+
+    def _registered_media_types(
+        self, roots: typing.Iterable[Application]
+    ) -> typing.Tuple[str, ...]:
+        """
+        Returns the content types of the codecs registered on apps and on
+        their parent applications, the codecs seen through the config_dict of
+        the requests they handle.
+        """
+        chains = _app_chains((*roots, *self._apps))
+        media_types = {}
+        for app in self._apps:
+            for app_in_chain in chains[id(app)]:
+                media_types.update(dict.fromkeys(registered_codecs(app_in_chain)))
+        media_types.pop("application/json", None)
+        return tuple(media_types)
+
+    def update(self, roots: typing.Iterable[Application] = ()) -> bool:
+        """
+        Update the specification and return True if it changed. roots are
+        applications whose sub-applications can be in apps.
+        """
+        apps = tuple(id(app) for app in self._apps)
+        if apps == self._frozen_apps:
+            return False
+
+        routes = self._routes()
+        paths = self._oas.spec.setdefault("paths", {})
+        changed = False
+        media_types = self._registered_media_types(roots)
+        if media_types != self._media_types:
+            # Document again all the routes with the new media types.
+            for path, method in self._documented:
+                paths[path].pop(method, None)
+                if not paths[path]:
+                    del paths[path]
+            self._documented = {}
+            self._media_types = media_types
+        for path, method in self._documented.keys() - routes.keys():
+            paths[path].pop(method, None)
+            if not paths[path]:
+                del paths[path]
+            changed = True
+
+        for (path, method), view in routes.items():
+            if self._documented.get((path, method)) is view:
+                continue
+            if (path, method) in self._documented:
+                paths[path].pop(method, None)
+            _add_http_method_to_oas(
+                self._oas,
+                self._oas.paths[path],
+                method,
+                view,
+                self._schemas,
+                self._media_types,
+            )
+            changed = True
+
+        self._documented = routes
+        if all(app.router.frozen for app in self._apps):
+            self._frozen_apps = apps
+        return changed
 
 
 def generate_oas(apps: List[Application]) -> dict:
     """
     Generate and return Open Api Specification from PydanticView in application.
     """
-    oas = OpenApiSpec3()
-    for app in apps:
-        for resources in app.router.resources():
-            for resource_route in resources:
-                if not is_pydantic_view(resource_route.handler):
-                    continue
+    builder = _OASBuilder(apps)
+    builder.update()
+    return builder.spec
 
-                view: Type[PydanticView] = resource_route.handler
-                info = resource_route.get_info()
-                path = oas.paths[info.get("path", info.get("formatter"))]
-                if resource_route.method == "*":
-                    for method_name in view.allowed_methods:
-                        _add_http_method_to_oas(oas, path, method_name, view)
-                else:
-                    _add_http_method_to_oas(oas, path, resource_route.method, view)
 
-    return oas.spec
+class _EncodedSpec:
+    """
+    The Open Api Specification encoded once, with its ETag and its
+    compressed variants.
+    """
+
+    def __init__(self, body: bytes, content_type: str):
+        self.content_type = content_type
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.variants = {"identity": body, "gzip": gzip.compress(body)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body)
+
+    def negotiate(self, accept_encoding: str) -> str:
+        """
+        Returns the best content-coding accepted by the client.
+        """
+        accepted = set()
+        for coding in accept_encoding.lower().split(","):
+            name, *params = coding.split(";")
+            quality = 1.0
+            for param in params:
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(name.strip())
+
+        for name in ("br", "gzip"):
+            if name in self.variants and name in accepted:
+                return name
+        return "identity"
+
+
+class _SpecCache:
+    """
+    Generate the Open Api Specification on first use and keep it encoded.
+    The specification is updated and encoded again when routes are added.
+    """
+
+    def __init__(self, apps: typing.Iterable[Application]):
+        self._builder = _OASBuilder(apps)
+        self._encoded: typing.Optional[_EncodedSpec] = None
+
+    def get(self, codec, roots: typing.Iterable[Application] = ()) -> _EncodedSpec:
+        if self._builder.update(roots) or self._encoded is None:
+            body = codec.dumps(self._builder.spec)
+            self._encoded = _EncodedSpec(body, codec.content_type)
+        return self._encoded
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
 
 
 async def get_oas(request):
     """
     View to generate the Open Api Specification from PydanticView in application.
     """
-    apps = request.app["apps to expose"]
-    return json_response(generate_oas(apps))
+    spec = request.app["spec cache"].get(
+        get_codec(request), request.match_info.apps[:1]
+    )
+    headers = {"ETag": spec.etag, "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None and _etag_matches(spec.etag, if_none_match):
+        return Response(status=304, headers=headers)
+
+    coding = spec.negotiate(request.headers.get("Accept-Encoding", ""))
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+
+    return Response(
+        body=spec.variants[coding], content_type=spec.content_type, headers=headers
+    )
+
+
+class _IndexTemplate:
+    """
+    The template of the swagger-ui page. jinja2 is imported and the template
+    is compiled on first use. The rendered pages are kept in a LRU cache
+    because they only depend on the URLs of the spec and of static files.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self._template = None
+        self.render_page = lru_cache(maxsize=maxsize)(self._render_page)
+
+    def render(self, context: dict) -> str:
+        if self._template is None:
+            import jinja2
+
+            self._template = jinja2.Template(
+                resources.read_text("aiohttp_pydantic.oas", "index.j2")
+            )
+        return self._template.render(context)
+
+    def _render_page(
+        self, openapi_spec_url: str, static_url: str
+    ) -> typing.Tuple[bytes, str]:
+        """
+        Returns the encoded page and its ETag.
+        """
+        page = self.render(
+            {"openapi_spec_url": openapi_spec_url, "static_url": static_url}
+        ).encode()
+        return page, f'"{hashlib.blake2b(page, digest_size=16).hexdigest()}"'
+
+
+# The static files of a swagger-ui version never change, their URL contains
+# the swagger-ui version.
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+INDEX_CACHE_CONTROL = "public, max-age=300"
+
+
+@lru_cache(maxsize=1)
+def _swagger_ui_path() -> Path:
+    """
+    Returns the directory of swagger-ui files, swagger_ui_bundle is imported
+    on first use.
+    """
+    from swagger_ui_bundle import swagger_ui_path
+
+    return Path(swagger_ui_path).resolve()
+
+
+async def oas_static(request):
+    """
+    View to serve the static files of swagger-ui.
+    """
+    root = _swagger_ui_path()
+    if request.match_info["version"] != root.name:
+        raise HTTPNotFound()
+
+    path = root.joinpath(request.match_info["filename"]).resolve()
+    if root not in path.parents or not path.is_file():
+        raise HTTPNotFound()
+    return FileResponse(path, headers={"Cache-Control": STATIC_CACHE_CONTROL})
 
 
 async def oas_ui(request):
@@ -250,17 +633,20 @@ async def oas_ui(request):
     """
     template = request.app["index template"]
 
-    static_url = request.app.router["static"].url_for(filename="")
+    static_url = request.app.router["static"].url_for(
+        version=_swagger_ui_path().name, filename=""
+    )
     spec_url = request.app.router["spec"].url_for()
     host = request.url.origin()
 
+    page, etag = template.render_page(
+        str(host.with_path(str(spec_url))), str(host.with_path(str(static_url)))
+    )
+    headers = {"ETag": etag, "Cache-Control": INDEX_CACHE_CONTROL}
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None and _etag_matches(etag, if_none_match):
+        return Response(status=304, headers=headers)
+
     return Response(
-        text=template.render(
-            {
-                "openapi_spec_url": host.with_path(str(spec_url)),
-                "static_url": host.with_path(str(static_url)),
-            }
-        ),
-        content_type="text/html",
-        charset="utf-8",
+        body=page, content_type="text/html", charset="utf-8", headers=headers
     )
@@ -0,0 +1,179 @@
+"""
+Build the response of a handler returning data instead of a web.Response.
+
+The status code is chosen using the return annotation of the handler:
+
+    class PetItemView(PydanticView):
+        async def get(self, id: int, /) -> Union[r200[Pet], r404[Error]]:
+            pet = self.request.app["model"].find_pet(id)
+            if pet is None:
+                return Error(error="Pet not found")  # 404
+            return pet  # 200
+
+A handler annotated with r200[AsyncIterator[Model]] can return an async
+iterator, the models are written in a chunked response while they are
+produced, as a JSON array or as newline delimited JSON if the client
+accepts application/x-ndjson, application/ndjson or application/jsonl.
+"""
+
+import typing
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+from aiohttp.web import Response, StreamResponse
+from aiohttp.web_request import BaseRequest
+
+from .codec import Codec, _media_ranges
+from .injectors import NDJSON_CONTENT_TYPES
+from .oas.typing import is_status_code_type
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+# Encoded items are buffered until this size before being written.
+STREAM_BUFFER_SIZE = 2**16
+
+ResponseTypes = Tuple[Tuple[int, Any], ...]
+
+
+def get_response_types(handler: Callable) -> ResponseTypes:
+    """
+    Returns the (status code, content type) pairs of the status code types
+    used to annotate the value returned by handler. The content type is None
+    for status code types without content such as r204.
+    """
+    return_type = getattr(handler, "__annotations__", {}).get("return")
+    if return_type is None:
+        return ()
+
+    if typing.get_origin(return_type) is typing.Union:
+        candidates = typing.get_args(return_type)
+    else:
+        candidates = (return_type,)
+
+    response_types = []
+    for candidate in candidates:
+        if is_status_code_type(typing.get_origin(candidate)):
+            status_code = typing.get_origin(candidate).__name__[1:]
+            content_type = typing.get_args(candidate)[0]
+            response_types.append((int(status_code), content_type))
+        elif is_status_code_type(candidate):
+            response_types.append((int(candidate.__name__[1:]), None))
+    return tuple(response_types)
+
+
+def _is_instance(data: Any, content_type: Any) -> bool:
+    if content_type is None:
+        return data is None
+    try:
+        return isinstance(data, typing.get_origin(content_type) or content_type)
+    except TypeError:
+        return False
+
+
+def select_status_code(response_types: ResponseTypes, data: Any) -> Optional[int]:
+    """
+    Returns the status code of the first content type matching data, or the
+    first status code if no content type matches.
+    """
+    for status_code, content_type in response_types:
+        if _is_instance(data, content_type):
+            return status_code
+
+    if response_types:
+        return response_types[0][0]
+    return None
+
+
+def make_response(codec: Codec, response_types: ResponseTypes, data: Any) -> Response:
+    """
+    Returns a web.Response containing data encoded with codec. None gives an
+    empty response if a status code type without content, such as r204, is
+    declared, and raises a TypeError otherwise.
+    """
+    status_code = select_status_code(response_types, data) or 200
+    if data is None:
+        if (status_code, None) in response_types:
+            return Response(status=status_code)
+        raise TypeError(
+            "The handler returned None without declaring a status code"
+            " without content such as r204"
+        )
+    return codec.response(data, status=status_code)
+
+
+def _accepted_ndjson_type(accept: str, codec: Codec) -> Optional[str]:
+    """
+    Return the NDJSON content type preferred by the Accept header to the
+    content type of codec, or None.
+    """
+    for media_range in _media_ranges(accept):
+        if media_range in NDJSON_CONTENT_TYPES:
+            return media_range
+        if media_range in (codec.content_type, "*/*", "application/*"):
+            return None
+    return None
+
+
+async def pull_first_item(items: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """
+    Produces the first item of items, so the exceptions raised until then can
+    still be turned into an error response, and returns an async iterator
+    yielding all the items.
+    """
+    items = items.__aiter__()
+    try:
+        first_item = await items.__anext__()
+    except StopAsyncIteration:
+        return items
+
+    async def all_items():
+        yield first_item
+        async for item in items:
+            yield item
+
+    return all_items()
+
+
+async def make_stream_response(
+    request: BaseRequest,
+    codec: Codec,
+    response_types: ResponseTypes,
+    items: AsyncIterator[Any],
+) -> StreamResponse:
+    """
+    Returns a chunked response containing the items encoded with codec
+    while they are produced. write() waits for the transport to be drained
+    so at most one buffer of encoded items is kept in memory.
+
+    The response is prepared before the iteration: an exception raised by
+    items aborts the response, the status code is already sent so the
+    connection is closed without terminating the chunked body. Use
+    pull_first_item() to produce the first item before.
+    """
+    ndjson_type = _accepted_ndjson_type(request.headers.get("Accept", ""), codec)
+    response = StreamResponse(status=select_status_code(response_types, items) or 200)
+    response.content_type = ndjson_type or codec.content_type
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    if ndjson_type:
+        prefix, separator, suffix = b"", b"\n", b"\n"
+    else:
+        prefix, separator, suffix = b"[", b",", b"]"
+
+    buffer = bytearray(prefix)
+    first = True
+    async for item in items:
+        if not first:
+            buffer += separator
+        first = False
+        buffer += codec.dumps(item)
+        if len(buffer) >= STREAM_BUFFER_SIZE:
+            await response.write(buffer)
+            buffer = bytearray()
+
+    if not (first and ndjson_type):
+        buffer += suffix
+    if buffer:
+        await response.write(buffer)
+    await response.write_eof()
+    return response
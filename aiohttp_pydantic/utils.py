@@ -1,4 +1,9 @@
+import typing
+from collections.abc import AsyncIterator
+from typing import Any, Optional, Tuple, Type
+
 from pydantic import BaseModel
+from typing_extensions import Annotated, get_args, get_origin
 
 
 def is_pydantic_base_model(obj):
@@ -9,3 +14,26 @@ def is_pydantic_base_model(obj):
         return issubclass(obj, BaseModel)
     except TypeError:
         return False
+
+
+def get_stream_model(obj) -> Optional[Type[BaseModel]]:
+    """
+    Return the pydantic.BaseModel subclass M if obj is AsyncIterator[M]
+    else None.
+    """
+    if typing.get_origin(obj) is AsyncIterator:
+        item_type = typing.get_args(obj)[0]
+        if is_pydantic_base_model(item_type):
+            return item_type
+    return None
+
+
+def unwrap_annotated(obj) -> Tuple[Any, tuple]:
+    """
+    Return the type T and the metadata of Annotated[T, ...], return obj and an
+    empty tuple if obj is not annotated.
+    """
+    if get_origin(obj) is Annotated:
+        type_, *metadata = get_args(obj)
+        return type_, tuple(metadata)
+    return obj, ()
@@ -1,22 +1,45 @@
+import asyncio
+from collections.abc import AsyncIterator
 from functools import update_wrapper
-from inspect import iscoroutinefunction
-from typing import Any, Callable, Generator, Iterable
+from http import HTTPStatus
+from inspect import isasyncgenfunction, iscoroutinefunction
+from itertools import islice
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional
 
 from aiohttp.abc import AbstractView
 from aiohttp.hdrs import METH_ALL
-from aiohttp.web import json_response
-from aiohttp.web_exceptions import HTTPMethodNotAllowed
+from aiohttp.web_app import Application
+from aiohttp.web_exceptions import HTTPClientError, HTTPMethodNotAllowed
+from aiohttp.web_request import BaseRequest
 from aiohttp.web_response import StreamResponse
 from pydantic import ValidationError
+from pydantic.error_wrappers import flatten_errors
 
+from .codec import Codec, get_codec, get_response_codec, registered_codecs
 from .injectors import (
     AbstractInjector,
     BodyGetter,
+    BodyStreamGetter,
+    BodyStreamValidationError,
+    FormGetter,
     HeadersGetter,
     MatchInfoGetter,
     QueryGetter,
+    RequestGetter,
+    _check_content_encoding,
     _parse_func_signature,
+    get_body_constraints,
+    get_form,
 )
+from .instrumentation import Instrumentation
+from .response import (
+    get_response_types,
+    make_response,
+    make_stream_response,
+    pull_first_item,
+)
+from .utils import get_stream_model
 
 
 class PydanticView(AbstractView):
@@ -24,32 +47,122 @@ class PydanticView(AbstractView):
     An AIOHTTP View that validate request using function annotations.
     """
 
+    # Validate the URL path, the query string and the HTTP headers
+    # using a single pydantic model per handler.
+    merge_request_model: bool = False
+
+    # Codec used to decode the request body, encode the validation errors
+    # and the data returned by handlers instead of a web.Response.
+    # If None, the codec set on the application is used.
+    codec: Optional[Codec] = None
+
+    # Build the injectors of a handler, and their pydantic models, on the
+    # first request instead of at class creation. See compile_views().
+    deferred_compilation: bool = False
+
+    # Status code of the responses to requests with invalid parameters.
+    validation_error_status: int = 418
+
+    # Maximal number of validation errors reported, None to report all the
+    # errors. The next errors are not enumerated.
+    max_validation_errors: Optional[int] = None
+
+    # Report the validation errors as RFC 7807 problem details.
+    problem_details: bool = False
+
+    # Encode the data returned by handlers without status code return
+    # annotation, such as r200[Model], instead of a web.Response. The data
+    # returned by annotated handlers is always encoded.
+    encode_responses: bool = False
+
+    # Receives the durations of the injectors and of the handlers. It must be
+    # set when the class is defined, the handlers of views without
+    # instrumentation do not run any instrumentation code.
+    instrumentation: Optional[Instrumentation] = None
+
     async def _iter(self) -> StreamResponse:
         method = getattr(self, self.request.method.lower(), None)
         resp = await method()
-        return resp
+        if isinstance(resp, StreamResponse):
+            return resp
+
+        response_types = self._response_types[self.request.method]
+        if not (response_types or self.encode_responses):
+            return resp
+        if isinstance(resp, AsyncIterator):
+            # An invalid body item read before the first item is produced is
+            # reported like the other validation errors, after it the status
+            # code is already sent and the stream is aborted.
+            try:
+                resp = await pull_first_item(resp)
+            except BodyStreamValidationError as error:
+                if self.instrumentation is not None:
+                    self.instrumentation.on_validation_failure(
+                        method.__qualname__, BodyStreamGetter.context
+                    )
+                return _validation_error_response(self, error, _locate_in_body)
+            # The items are framed as a JSON array or as NDJSON.
+            codec = get_codec(self.request, self.codec)
+            return await make_stream_response(
+                self.request, codec, response_types, resp
+            )
+        codec = get_response_codec(self.request, self.codec)
+        return _vary_accept(self.request, make_response(codec, response_types, resp))
 
     def __await__(self) -> Generator[Any, None, StreamResponse]:
         return self._iter().__await__()
 
+    def on_validation_error(self, errors: List[dict]) -> StreamResponse:
+        """
+        Returns the response to a request with invalid parameters. Each error
+        of errors has a "in" key giving where the invalid value was found.
+        """
+        codec = get_response_codec(self.request, self.codec)
+        status = self.validation_error_status
+        if not self.problem_details:
+            return _vary_accept(self.request, codec.response(errors, status=status))
+
+        try:
+            title = HTTPStatus(status).phrase
+        except ValueError:
+            title = "Validation error"
+        problem = {
+            "type": "about:blank",
+            "title": title,
+            "status": status,
+            "detail": "The request parameters are invalid.",
+            "errors": errors,
+        }
+        response = codec.response(problem, status=status)
+        if codec.content_type == "application/json":
+            response.content_type = "application/problem+json"
+        return _vary_accept(self.request, response)
+
     def __init_subclass__(cls, **kwargs):
         cls.allowed_methods = {
             meth_name for meth_name in METH_ALL if hasattr(cls, meth_name.lower())
         }
 
+        cls._response_types = {}
         for meth_name in METH_ALL:
             if meth_name not in cls.allowed_methods:
                 setattr(cls, meth_name.lower(), cls.raise_not_allowed)
             else:
                 handler = getattr(cls, meth_name.lower())
-                decorated_handler = inject_params(handler, cls.parse_func_signature)
+                cls._response_types[meth_name] = get_response_types(handler)
+                decorated_handler = inject_params(
+                    handler,
+                    cls.parse_func_signature,
+                    cls.deferred_compilation,
+                    cls.instrumentation,
+                )
                 setattr(cls, meth_name.lower(), decorated_handler)
 
     async def raise_not_allowed(self):
         raise HTTPMethodNotAllowed(self.request.method, self.allowed_methods)
 
-    @staticmethod
-    def parse_func_signature(func: Callable) -> Iterable[AbstractInjector]:
+    @classmethod
+    def parse_func_signature(cls, func: Callable) -> Iterable[AbstractInjector]:
         path_args, body_args, qs_args, header_args, defaults = _parse_func_signature(
             func
         )
@@ -61,10 +174,26 @@ class PydanticView(AbstractView):
             """
             return {name: defaults[name] for name in args if name in defaults}
 
+        if cls.merge_request_model and (path_args or qs_args or header_args):
+            request_defaults = default_value({**path_args, **qs_args, **header_args})
+            injectors.append(
+                RequestGetter(path_args, qs_args, header_args, request_defaults)
+            )
+            path_args = qs_args = header_args = {}
+
         if path_args:
             injectors.append(MatchInfoGetter(path_args, default_value(path_args)))
         if body_args:
-            injectors.append(BodyGetter(body_args, default_value(body_args)))
+            body_annotation = next(iter(body_args.values()))
+            body_type, _ = get_body_constraints(body_annotation)
+            if get_form(body_annotation) is not None:
+                body_getter = FormGetter
+            elif get_stream_model(body_type) is not None:
+                body_getter = BodyStreamGetter
+            else:
+                body_getter = BodyGetter
+            body_defaults = default_value(body_args)
+            injectors.append(body_getter(body_args, body_defaults, cls.codec))
         if qs_args:
             injectors.append(QueryGetter(qs_args, default_value(qs_args)))
         if header_args:
@@ -72,36 +201,228 @@ class PydanticView(AbstractView):
         return injectors
 
 
+def _vary_accept(request: BaseRequest, response: StreamResponse) -> StreamResponse:
+    """
+    Add Accept to the Vary header of a response whose codec was negotiated.
+    """
+    if registered_codecs(request.config_dict):
+        response.headers.add("Vary", "Accept")
+    return response
+
+
+class InjectionPlan:
+    """
+    The injectors of a handler, the synchronous injectors are run before the
+    asynchronous ones.
+    """
+
+    __slots__ = (
+        "sync_injectors",
+        "async_injectors",
+        "instrumented_injectors",
+        "reads_body",
+        "compile_time_ns",
+    )
+
+    def __init__(self, injectors: Iterable[AbstractInjector], compile_time_ns: int):
+        injectors = sorted(
+            injectors, key=lambda injector: iscoroutinefunction(injector.inject)
+        )
+        self.sync_injectors = tuple(
+            (injector.error_location, injector.inject)
+            for injector in injectors
+            if not iscoroutinefunction(injector.inject)
+        )
+        self.async_injectors = tuple(
+            (injector.error_location, injector.inject)
+            for injector in injectors
+            if iscoroutinefunction(injector.inject)
+        )
+        self.instrumented_injectors = tuple(
+            (
+                injector.context,
+                injector.error_location,
+                injector.inject,
+                iscoroutinefunction(injector.inject),
+            )
+            for injector in injectors
+        )
+        # A body with constraints is read by its injector to be checked
+        # while it is read.
+        self.reads_body = any(
+            isinstance(injector, BodyGetter) and injector.constraints is None
+            for injector in injectors
+        )
+        self.compile_time_ns = compile_time_ns
+
+
 def inject_params(
-    handler, parse_func_signature: Callable[[Callable], Iterable[AbstractInjector]]
+    handler,
+    parse_func_signature: Callable[[Callable], Iterable[AbstractInjector]],
+    deferred: bool = False,
+    instrumentation: Optional[Instrumentation] = None,
 ):
     """
     Decorator to unpack the query string, route path, body and http header in
     the parameters of the web handler regarding annotations.
+
+    The injection plan is compiled once: synchronous injectors are run before
+    the asynchronous ones so a request with an invalid path, query string or
+    header is rejected before its body is read. A handler without parameter
+    to inject is returned as is, unless it is an async generator function:
+    the wrapper returns the async generator without awaiting it.
+
+    If deferred is True, the injection plan is compiled on the first call or
+    by the compile_injection_plan() attribute of the returned handler.
+
+    If instrumentation is not None, the handler is always wrapped and the
+    measures are sent to instrumentation.
     """
 
-    injectors = parse_func_signature(handler)
+    handler_is_async_gen = isasyncgenfunction(handler)
+    plan: Optional[InjectionPlan] = None
+
+    def compile_injection_plan() -> InjectionPlan:
+        nonlocal plan
+        if plan is None:
+            start = perf_counter_ns()
+            injectors = parse_func_signature(handler)
+            plan = InjectionPlan(injectors, perf_counter_ns() - start)
+            wrapper.injection_plan = plan
+        return plan
 
     async def wrapped_handler(self):
+        injection_plan = plan or compile_injection_plan()
+        request = self.request
         args = []
         kwargs = {}
-        for injector in injectors:
-            try:
-                if iscoroutinefunction(injector.inject):
-                    await injector.inject(self.request, args, kwargs)
-                else:
-                    injector.inject(self.request, args, kwargs)
-            except ValidationError as error:
-                errors = error.errors()
-                for error in errors:
-                    error["in"] = injector.context
+        locate = None
+        try:
+            for locate, inject in injection_plan.sync_injectors:
+                inject(request, args, kwargs)
+            for locate, inject in injection_plan.async_injectors:
+                await inject(request, args, kwargs)
+        except ValidationError as error:
+            return _validation_error_response(self, error, locate)
 
-                return json_response(data=errors, status=418)
+        if handler_is_async_gen:
+            return handler(self, *args, **kwargs)
 
-        return await handler(self, *args, **kwargs)
+        try:
+            return await handler(self, *args, **kwargs)
+        except BodyStreamValidationError as error:
+            return _validation_error_response(self, error, _locate_in_body)
 
-    update_wrapper(wrapped_handler, handler)
-    return wrapped_handler
+    handler_name = handler.__qualname__
+
+    async def instrumented_handler(self):
+        injection_plan = plan or compile_injection_plan()
+        request = self.request
+        body_to_read = injection_plan.reads_body
+        args = []
+        kwargs = {}
+        location = locate = None
+        try:
+            for location, locate, inject, is_async in (
+                injection_plan.instrumented_injectors
+            ):
+                if is_async and body_to_read:
+                    # Read once the path, query string and headers are valid.
+                    body_to_read = False
+                    _check_content_encoding(request)
+                    start = perf_counter_ns()
+                    body = await request.read()
+                    instrumentation.on_body_read(
+                        handler_name, perf_counter_ns() - start, len(body)
+                    )
+
+                start = perf_counter_ns()
+                try:
+                    if is_async:
+                        await inject(request, args, kwargs)
+                    else:
+                        inject(request, args, kwargs)
+                finally:
+                    instrumentation.on_inject(
+                        handler_name, location, perf_counter_ns() - start
+                    )
+        except ValidationError as error:
+            instrumentation.on_validation_failure(handler_name, location)
+            return _validation_error_response(self, error, locate)
+        except HTTPClientError:
+            instrumentation.on_validation_failure(handler_name, location)
+            raise
+
+        if handler_is_async_gen:
+            return _measure_items(
+                handler(self, *args, **kwargs), instrumentation, handler_name
+            )
+
+        start = perf_counter_ns()
+        try:
+            return await handler(self, *args, **kwargs)
+        except BodyStreamValidationError as error:
+            instrumentation.on_validation_failure(
+                handler_name, BodyStreamGetter.context
+            )
+            return _validation_error_response(self, error, _locate_in_body)
+        finally:
+            instrumentation.on_handler(handler_name, perf_counter_ns() - start)
+
+    wrapper = wrapped_handler if instrumentation is None else instrumented_handler
+    update_wrapper(wrapper, handler)
+    wrapper.injection_plan = None
+    wrapper.compile_injection_plan = compile_injection_plan
+    if deferred:
+        # Report the signature errors at class creation, the parsing is cached.
+        _parse_func_signature(handler)
+        return wrapper
+
+    compile_injection_plan()
+    if not plan.sync_injectors and not plan.async_injectors:
+        if not handler_is_async_gen and instrumentation is None:
+            return handler
+    return wrapper
+
+
+async def _measure_items(
+    items: AsyncIterator, instrumentation: Instrumentation, handler_name: str
+) -> AsyncIterator:
+    """
+    Yields the items of an async generator handler and reports the time
+    spent to iterate over them.
+    """
+    start = perf_counter_ns()
+    try:
+        async for item in items:
+            yield item
+    finally:
+        instrumentation.on_handler(handler_name, perf_counter_ns() - start)
+
+
+def _locate_in_body(error: dict) -> str:
+    return BodyStreamGetter.context
+
+
+def _validation_error_response(
+    view: PydanticView, error: ValidationError, locate: Callable[[dict], str]
+) -> StreamResponse:
+    """
+    Returns the response listing the validation errors and their location.
+    Only the reported errors are enumerated.
+    """
+    try:
+        config = error.model.__config__
+    except AttributeError:  # pydantic dataclass
+        config = error.model.__pydantic_model__.__config__
+
+    errors = []
+    for error_ in islice(
+        flatten_errors(error.raw_errors, config), view.max_validation_errors
+    ):
+        error_["in"] = locate(error_)
+        errors.append(error_)
+    return view.on_validation_error(errors)
 
 
 def is_pydantic_view(obj) -> bool:
@@ -112,3 +433,64 @@ def is_pydantic_view(obj) -> bool:
         return issubclass(obj, PydanticView)
     except TypeError:
         return False
+
+
+def _iter_views(apps: Iterable[Application]) -> Iterable[type]:
+    seen = set()
+    for app in apps:
+        for resources in app.router.resources():
+            for resource_route in resources:
+                view = resource_route.handler
+                if is_pydantic_view(view) and view not in seen:
+                    seen.add(view)
+                    yield view
+
+
+def _handlers(view: type) -> Iterable[Callable]:
+    for meth_name in view.allowed_methods:
+        yield getattr(view, meth_name.lower())
+
+
+def compilation_stats(apps: Iterable[Application]) -> Dict[str, int]:
+    """
+    Returns the number of PydanticView handlers of apps whose injection plan
+    is compiled, the number of handlers waiting for compilation and the time
+    spent to compile the injection plans in nanoseconds.
+    """
+    stats = {"compiled": 0, "pending": 0, "compile_time_ns": 0}
+    for view in _iter_views(apps):
+        for handler in _handlers(view):
+            if not hasattr(handler, "compile_injection_plan"):
+                continue
+            plan = handler.injection_plan
+            if plan is None:
+                stats["pending"] += 1
+            else:
+                stats["compiled"] += 1
+                stats["compile_time_ns"] += plan.compile_time_ns
+    return stats
+
+
+async def compile_views(apps: Iterable[Application]) -> Dict[str, int]:
+    """
+    Compile the injection plans of the PydanticView of apps not compiled yet,
+    and returns compilation_stats(apps). The event loop runs other tasks
+    between two views, so this coroutine can be run as a background task
+    while the application serves requests. Keep a reference to the task and
+    cancel it on cleanup:
+
+        async def warm_up(app):
+            task = asyncio.create_task(compile_views([app]))
+            yield
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        app.cleanup_ctx.append(warm_up)
+    """
+    for view in _iter_views(apps):
+        for handler in _handlers(view):
+            if getattr(handler, "injection_plan", True) is None:
+                handler.compile_injection_plan()
+        await asyncio.sleep(0)
+    return compilation_stats(apps)
@@ -0,0 +1,8 @@
+"""
+Benchmarks of aiohttp_pydantic.
+
+Each module can be run with python -m and writes its results as JSON, so
+results of two commits can be compared:
+
+    python -m benchmarks.oas -o before.json
+"""
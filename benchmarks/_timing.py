@@ -0,0 +1,69 @@
+"""
+Helpers to time the benchmarked functions and to describe the environment.
+"""
+
+import platform
+import statistics
+import subprocess
+import sys
+from time import perf_counter_ns
+from typing import Callable, Dict
+
+import aiohttp
+import pydantic
+
+import aiohttp_pydantic
+
+
+def measure(func: Callable[[], object], repeat: int, number: int = 1) -> Dict:
+    """
+    Call func number times, repeat times and return durations in ns per call.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        for _ in range(number):
+            func()
+        timings.append((perf_counter_ns() - start) / number)
+
+    return summarize(timings)
+
+
+def summarize(timings) -> Dict:
+    """
+    Return statistics of a list of durations in ns.
+    """
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "min_ns": timings[0],
+        "median_ns": statistics.median(timings),
+        "mean_ns": statistics.fmean(timings),
+        "p99_ns": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        "max_ns": timings[-1],
+    }
+
+
+def environment() -> Dict:
+    """
+    Describe the environment to compare only comparable results.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "aiohttp": aiohttp.__version__,
+        "aiohttp_pydantic": aiohttp_pydantic.__version__,
+        "pydantic": pydantic.VERSION,
+    }
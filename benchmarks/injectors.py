@@ -0,0 +1,393 @@
+"""
+Benchmark the request path: the injectors called with mocked requests and
+the PydanticView handlers called through the aiohttp test server.
+
+Each scenario reports the time per operation in ns, the peak memory increase
+during an operation (Python 3.9+), the memory blocks still allocated after an
+operation and the p50/p99 latencies:
+
+    python -m benchmarks.injectors -o results.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tracemalloc
+from time import perf_counter_ns
+from typing import Awaitable, Callable, Dict, List, Optional
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.streams import StreamReader
+from aiohttp.test_utils import TestClient, TestServer, make_mocked_request
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.injectors import (
+    BodyGetter,
+    HeadersGetter,
+    MatchInfoGetter,
+    QueryGetter,
+)
+
+from ._timing import environment, summarize
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    tags: List[str]
+
+
+class Payload(BaseModel):
+    items: List[Item]
+
+
+def make_body(nb_items: int) -> bytes:
+    items = [
+        {"id": i, "name": f"item {i}", "tags": ["a", "b"]} for i in range(nb_items)
+    ]
+    return json.dumps({"items": items}).encode()
+
+
+def make_headers(nb_headers: int) -> Dict[str, str]:
+    headers = {"Authorization": "Bearer token"}
+    headers.update(
+        (f"X-Proxy-Header-{i}", f"value {i}") for i in range(nb_headers - 1)
+    )
+    return headers
+
+
+def make_query_string(nb_params: int, nb_repeats: int) -> str:
+    params = ["page=2&size=20"]
+    params.extend(
+        f"filter_{i}=value{j}" for i in range(nb_params) for j in range(nb_repeats)
+    )
+    return "&".join(params)
+
+
+def _make_payload(body: bytes) -> StreamReader:
+    payload = StreamReader(mock.Mock(), 2**16, loop=asyncio.get_event_loop())
+    payload.feed_data(body)
+    payload.feed_eof()
+    return payload
+
+
+class Scenario:
+    """
+    An injector and the factory of requests it is called with.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        injector,
+        make_request: Callable[[], web.Request],
+        parameters: dict,
+    ):
+        self.name = name
+        self.injector = injector
+        self.make_request = make_request
+        self.parameters = parameters
+
+    async def call(self, request: web.Request):
+        args, kwargs = [], {}
+        result = self.injector.inject(request, args, kwargs)
+        if isinstance(result, Awaitable):
+            await result
+
+
+def injector_scenarios(
+    body_sizes: List[int], header_counts: List[int], query_cardinalities: List[int]
+) -> List[Scenario]:
+    scenarios = []
+
+    for nb_params in (1, 5):
+        args_spec = {f"p{i}": int for i in range(nb_params)}
+        match_info = {f"p{i}": str(i) for i in range(nb_params)}
+        scenarios.append(
+            Scenario(
+                "MatchInfoGetter",
+                MatchInfoGetter(args_spec, {}),
+                lambda match_info=match_info: make_mocked_request(
+                    "GET", "/", match_info=match_info
+                ),
+                {"path_params": nb_params},
+            )
+        )
+
+    for nb_items in body_sizes:
+        body = make_body(nb_items)
+        scenarios.append(
+            Scenario(
+                "BodyGetter",
+                BodyGetter({"payload": Payload}, {}),
+                lambda body=body: make_mocked_request(
+                    "POST",
+                    "/",
+                    headers={"Content-Type": "application/json"},
+                    payload=_make_payload(body),
+                ),
+                {"items": nb_items, "body_bytes": len(body)},
+            )
+        )
+
+    for nb_params in query_cardinalities:
+        for nb_repeats in (1, 10):
+            query_string = make_query_string(nb_params, nb_repeats)
+            scenarios.append(
+                Scenario(
+                    "QueryGetter",
+                    QueryGetter({"page": int, "size": int, "filter_0": str}, {}),
+                    lambda qs=query_string: make_mocked_request("GET", f"/?{qs}"),
+                    {"query_keys": nb_params + 2, "repeats": nb_repeats},
+                )
+            )
+
+    for nb_headers in header_counts:
+        headers = make_headers(nb_headers)
+        scenarios.append(
+            Scenario(
+                "HeadersGetter",
+                HeadersGetter({"authorization": str}, {}),
+                lambda headers=headers: make_mocked_request(
+                    "GET", "/", headers=headers
+                ),
+                {"headers": nb_headers},
+            )
+        )
+
+    return scenarios
+
+
+async def run_injector(scenario: Scenario, number: int) -> dict:
+    """
+    Call the injector with number fresh requests, the requests are created
+    before the measures.
+    """
+    requests = [scenario.make_request() for _ in range(number)]
+    timings = []
+    for request in requests:
+        start = perf_counter_ns()
+        await scenario.call(request)
+        timings.append(perf_counter_ns() - start)
+
+    requests = [scenario.make_request() for _ in range(number)]
+    tracemalloc.start()
+    # tracemalloc.reset_peak() is new in Python 3.9, without it the peak is
+    # the peak since tracemalloc.start() and cannot be measured per call.
+    can_reset_peak = hasattr(tracemalloc, "reset_peak")
+    peak_increase = 0
+    before_snapshot = tracemalloc.take_snapshot()
+    for request in requests:
+        before, _ = tracemalloc.get_traced_memory()
+        if can_reset_peak:
+            tracemalloc.reset_peak()
+        await scenario.call(request)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_increase += peak - before
+    after_snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # The blocks still allocated after the calls, the requests are kept alive
+    # so this counts what the injectors store on each request.
+    retained = after_snapshot.compare_to(before_snapshot, "filename")
+    return {
+        "injector": scenario.name,
+        "parameters": scenario.parameters,
+        "ns_per_op": summarize(timings)["mean_ns"],
+        "peak_memory_increase_bytes_per_op": (
+            peak_increase / number if can_reset_peak else None
+        ),
+        "retained_bytes_per_op": sum(stat.size_diff for stat in retained) / number,
+        "retained_blocks_per_op": sum(stat.count_diff for stat in retained) / number,
+        "latency": summarize(timings),
+    }
+
+
+class ServerScenario:
+    """
+    A PydanticView handler called through the aiohttp test server.
+    """
+
+    def __init__(self, name: str, view: type, request_kwargs: dict, parameters):
+        self.name = name
+        self.view = view
+        self.request_kwargs = request_kwargs
+        self.parameters = parameters
+
+
+class PathView(PydanticView):
+    async def get(self, p0: int, p1: int, /):
+        return web.Response()
+
+
+class BodyView(PydanticView):
+    async def post(self, payload: Payload):
+        return web.Response()
+
+
+class QueryView(PydanticView):
+    async def get(self, page: int, size: int, filter_0: Optional[str] = None):
+        return web.Response()
+
+
+class HeadersView(PydanticView):
+    async def get(self, *, authorization: str):
+        return web.Response()
+
+
+def server_scenarios(
+    body_sizes: List[int], header_counts: List[int], query_cardinalities: List[int]
+) -> List[ServerScenario]:
+    scenarios = [
+        ServerScenario(
+            "MatchInfoGetter", PathView, {"method": "GET", "path": "/1/2"}, {}
+        )
+    ]
+    for nb_items in body_sizes:
+        body = make_body(nb_items)
+        scenarios.append(
+            ServerScenario(
+                "BodyGetter",
+                BodyView,
+                {
+                    "method": "POST",
+                    "path": "/",
+                    "data": body,
+                    "headers": {"Content-Type": "application/json"},
+                },
+                {"items": nb_items, "body_bytes": len(body)},
+            )
+        )
+    for nb_params in query_cardinalities:
+        scenarios.append(
+            ServerScenario(
+                "QueryGetter",
+                QueryView,
+                {"method": "GET", "path": f"/?{make_query_string(nb_params, 1)}"},
+                {"query_keys": nb_params + 2, "repeats": 1},
+            )
+        )
+    for nb_headers in header_counts:
+        scenarios.append(
+            ServerScenario(
+                "HeadersGetter",
+                HeadersView,
+                {"method": "GET", "path": "/", "headers": make_headers(nb_headers)},
+                {"headers": nb_headers},
+            )
+        )
+    return scenarios
+
+
+async def run_server(scenario: ServerScenario, number: int) -> dict:
+    """
+    Send number requests one by one and measure the latency of each request.
+    """
+    app = web.Application(client_max_size=2**30)
+    if scenario.view is PathView:
+        app.router.add_view("/{p0}/{p1}", scenario.view)
+    else:
+        app.router.add_view("/", scenario.view)
+
+    async with TestClient(TestServer(app)) as client:
+        kwargs = dict(scenario.request_kwargs)
+        method, path = kwargs.pop("method"), kwargs.pop("path")
+        timings = []
+        for _ in range(number):
+            start = perf_counter_ns()
+            async with client.request(method, path, **kwargs) as resp:
+                await resp.read()
+                if resp.status != 200:
+                    raise RuntimeError(f"{scenario.name} returned {resp.status}")
+            timings.append(perf_counter_ns() - start)
+
+    return {
+        "view": scenario.view.__name__,
+        "injector": scenario.name,
+        "parameters": scenario.parameters,
+        "ns_per_op": summarize(timings)["mean_ns"],
+        "latency": summarize(timings),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scenario_args = (args.body_sizes, args.header_counts, args.query_cardinalities)
+    results = {
+        "benchmark": "injectors",
+        "environment": environment(),
+        "injectors": [
+            await run_injector(scenario, args.number)
+            for scenario in injector_scenarios(*scenario_args)
+        ],
+    }
+    if not args.no_server:
+        results["server"] = [
+            await run_server(scenario, args.server_number)
+            for scenario in server_scenarios(*scenario_args)
+        ]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=1000,
+        help="Number of injector calls per scenario",
+    )
+    parser.add_argument(
+        "--server-number",
+        type=int,
+        default=200,
+        help="Number of HTTP requests per scenario sent to the test server",
+    )
+    parser.add_argument(
+        "--body-sizes",
+        metavar="ITEMS",
+        type=int,
+        nargs="+",
+        default=[10, 1000, 20000],
+        help="Number of items of the request bodies",
+    )
+    parser.add_argument(
+        "--header-counts",
+        metavar="HEADERS",
+        type=int,
+        nargs="+",
+        default=[5, 40],
+        help="Number of HTTP headers sent",
+    )
+    parser.add_argument(
+        "--query-cardinalities",
+        metavar="KEYS",
+        type=int,
+        nargs="+",
+        default=[1, 20, 200],
+        help="Number of distinct undeclared keys in the query string. Mocked"
+        " requests repeat each key 1 and 10 times.",
+    )
+    parser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="Only call the injectors with mocked requests",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        type=argparse.FileType("w"),
+        help="File to write the JSON results",
+        default=sys.stdout,
+    )
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=4), file=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Benchmark the build time costs: the creation of PydanticView subclasses and
+the generation of the Open Api Specification.
+
+The benchmark synthesizes applications with N views using M models of
+varying depth. Run it for several N to check that the costs grow linearly
+with the size of the application:
+
+    python -m benchmarks.oas --views 10 100 1000 -o results.json
+"""
+
+import argparse
+import cProfile
+import json
+import sys
+from types import FunctionType
+from typing import List, Optional, Union
+
+from aiohttp import web
+from pydantic import BaseModel, create_model
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.oas.struct import OpenApiSpec3
+from aiohttp_pydantic.oas.typing import r200, r404
+from aiohttp_pydantic.oas.view import (
+    _add_http_method_to_oas,
+    _OASResponseBuilder,
+    generate_oas,
+)
+
+from ._timing import environment, measure
+
+
+def make_models(nb_models: int, max_depth: int) -> List[BaseModel]:
+    """
+    Return nb_models models, the model i nests 1 + i % max_depth levels.
+    """
+    models = []
+    for i in range(nb_models):
+        child = None
+        for level in range(1 + i % max_depth):
+            fields = {"id": (int, ...), "name": (str, ...), "tags": (List[str], [])}
+            if child is not None:
+                fields["child"] = (child, ...)
+                fields["children"] = (List[child], [])
+            child = create_model(f"Model{i}Level{level}", **fields)
+        models.append(child)
+    return models
+
+
+async def _get(self, id, /, page=1, size=None, *, x_request_id=None):
+    return web.json_response()
+
+
+async def _put(self, id, /, body):
+    return web.json_response()
+
+
+def _make_handler(template: FunctionType, annotations: dict) -> FunctionType:
+    handler = FunctionType(
+        template.__code__,
+        template.__globals__,
+        template.__name__.lstrip("_"),
+        template.__defaults__,
+        template.__closure__,
+    )
+    handler.__kwdefaults__ = template.__kwdefaults__
+    handler.__annotations__ = annotations
+    return handler
+
+
+def make_view_attrs(models: List[BaseModel], nb_views: int) -> List[dict]:
+    """
+    Return the attributes of nb_views views using the models.
+    """
+    views_attrs = []
+    for i in range(nb_views):
+        model = models[i % len(models)]
+        get = _make_handler(
+            _get,
+            {
+                "id": int,
+                "page": int,
+                "size": Optional[int],
+                "x_request_id": Optional[str],
+                "return": Union[r200[List[model]], r404],
+            },
+        )
+        put = _make_handler(_put, {"id": int, "body": model, "return": r200[model]})
+        views_attrs.append({"get": get, "put": put})
+    return views_attrs
+
+
+def make_views(views_attrs: List[dict], deferred: bool = False) -> List[type]:
+    return [
+        type(
+            f"View{i}",
+            (PydanticView,),
+            dict(attrs, deferred_compilation=deferred),
+        )
+        for i, attrs in enumerate(views_attrs)
+    ]
+
+
+def make_app(views: List[type]) -> web.Application:
+    app = web.Application()
+    for i, view in enumerate(views):
+        app.router.add_view(f"/resources-{i}/{{id}}", view)
+    return app
+
+
+def run(nb_views: int, nb_models: int, max_depth: int, repeat: int) -> dict:
+    """
+    Run the benchmarks for one application size and return the results.
+    """
+    models = make_models(nb_models, max_depth)
+    views_attrs = make_view_attrs(models, nb_views)
+    views = make_views(views_attrs)
+    app = make_app(views)
+    operations = [(view, method) for view in views for method in ("get", "put")]
+
+    def add_http_methods():
+        oas = OpenApiSpec3()
+        path = oas.paths["/"]
+        for view, method in operations:
+            _add_http_method_to_oas(oas, path, method, view)
+
+    def build_responses():
+        oas = OpenApiSpec3()
+        operation = oas.paths["/"].get
+        for view, method in operations:
+            return_type = getattr(view, method).__annotations__["return"]
+            _OASResponseBuilder(oas, operation, {}, None).build(return_type)
+
+    subclass_creation = measure(lambda: make_views(views_attrs), repeat)
+    deferred_subclass_creation = measure(
+        lambda: make_views(views_attrs, deferred=True), repeat
+    )
+    add_http_methods_timings = measure(add_http_methods, repeat)
+    build_responses_timings = measure(build_responses, repeat)
+    nb_operations = max(1, len(operations))
+    return {
+        "views": nb_views,
+        "models": nb_models,
+        "max_depth": max_depth,
+        "view_subclass_creation": subclass_creation,
+        "view_subclass_creation_per_view_ns": (
+            subclass_creation["median_ns"] / max(1, nb_views)
+        ),
+        "deferred_view_subclass_creation": deferred_subclass_creation,
+        "deferred_view_subclass_creation_per_view_ns": (
+            deferred_subclass_creation["median_ns"] / max(1, nb_views)
+        ),
+        "generate_oas": measure(lambda: generate_oas([app]), repeat),
+        "add_http_method_to_oas": add_http_methods_timings,
+        "add_http_method_to_oas_per_operation_ns": (
+            add_http_methods_timings["median_ns"] / nb_operations
+        ),
+        "oas_response_builder": build_responses_timings,
+        "oas_response_builder_per_operation_ns": (
+            build_responses_timings["median_ns"] / nb_operations
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--views",
+        metavar="N",
+        type=int,
+        nargs="+",
+        default=[10, 100, 400],
+        help="Number of views of each synthesized application",
+    )
+    parser.add_argument(
+        "--models", metavar="M", type=int, default=40, help="Number of models"
+    )
+    parser.add_argument(
+        "--depth", type=int, default=3, help="Maximal nesting level of models"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of runs of each benchmark"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write cProfile stats of generate_oas for the largest application",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        type=argparse.FileType("w"),
+        help="File to write the JSON results",
+        default=sys.stdout,
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "oas",
+        "environment": environment(),
+        "results": [
+            run(nb_views, args.models, args.depth, args.repeat)
+            for nb_views in args.views
+        ],
+    }
+
+    if args.profile:
+        models = make_models(args.models, args.depth)
+        app = make_app(make_views(make_view_attrs(models, max(args.views))))
+        cProfile.runctx(
+            "generate_oas([app])", globals(), {"app": app}, filename=args.profile
+        )
+
+    print(json.dumps(results, indent=4), file=args.output)
+
+
+if __name__ == "__main__":
+    main()
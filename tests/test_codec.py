@@ -0,0 +1,239 @@
+import json
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+from aiohttp_pydantic import PydanticView, codec, oas
+from aiohttp_pydantic.oas.typing import r200
+from aiohttp_pydantic.oas.view import generate_oas
+
+
+class ArticleModel(BaseModel):
+    name: str
+
+
+class ArticleView(PydanticView):
+    async def post(self, article: ArticleModel):
+        return web.json_response(article.dict())
+
+
+class ArticleReturningView(PydanticView):
+    async def post(self, article: ArticleModel) -> r200[ArticleModel]:
+        return article
+
+
+class CountingCodec(codec.Codec):
+    def __init__(self):
+        self.nb_loads = 0
+        self.nb_dumps = 0
+        super().__init__(self.count_loads, self.count_dumps)
+
+    def count_loads(self, data):
+        self.nb_loads += 1
+        return json.loads(data)
+
+    def count_dumps(self, data):
+        self.nb_dumps += 1
+        return json.dumps(data).encode()
+
+
+def test_fast_json_codec_should_encode_and_decode_json():
+    fast_codec = codec.fast_json_codec()
+    assert fast_codec.loads(fast_codec.dumps({"a": [1, "b"]})) == {"a": [1, "b"]}
+    assert fast_codec.loads(fast_codec.dumps({1: "a"})) == {"1": "a"}
+    assert fast_codec.content_type == "application/json"
+
+
+async def test_codec_set_on_app_should_decode_body_and_encode_errors(
+    aiohttp_client, loop
+):
+    app_codec = CountingCodec()
+    app = web.Application()
+    codec.setup(app, app_codec)
+    app.router.add_view("/article", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", json={"name": "foo"})
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo"}
+    assert (app_codec.nb_loads, app_codec.nb_dumps) == (1, 0)
+
+    resp = await client.post("/article", json={})
+    assert resp.status == 418
+    assert resp.content_type == "application/json"
+    assert (await resp.json())[0]["loc"] == ["name"]
+    assert (app_codec.nb_loads, app_codec.nb_dumps) == (2, 1)
+
+
+async def test_codec_set_on_view_should_be_used_before_app_codec(
+    aiohttp_client, loop
+):
+    view_codec = CountingCodec()
+    app_codec = CountingCodec()
+
+    class ViewWithCodec(ArticleView):
+        codec = view_codec
+
+        async def post(self, article: ArticleModel):
+            return web.json_response(article.dict())
+
+    app = web.Application()
+    codec.setup(app, app_codec)
+    app.router.add_view("/article", ViewWithCodec)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", json={})
+    assert resp.status == 418
+    assert (view_codec.nb_loads, view_codec.nb_dumps) == (1, 1)
+    assert (app_codec.nb_loads, app_codec.nb_dumps) == (0, 0)
+
+
+async def test_malformed_json_should_return_bad_request_with_any_codec(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    codec.setup(app, codec.fast_json_codec())
+    app.router.add_view("/article", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", data="{not json")
+    assert resp.status == 400
+    assert await resp.json() == {"error": "Malformed JSON"}
+
+
+async def test_oas_spec_should_be_encoded_with_app_codec(aiohttp_client, loop):
+    app_codec = CountingCodec()
+    app = web.Application()
+    codec.setup(app, app_codec)
+    app.router.add_view("/article", ArticleView)
+    oas.setup(app)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/oas/spec")
+    assert resp.status == 200
+    assert "/article" in (await resp.json())["paths"]
+    assert app_codec.nb_dumps == 1
+
+
+# A binary codec standing for MessagePack or CBOR.
+REVERSED_JSON_CODEC = codec.Codec(
+    lambda data: json.loads(data[::-1]),
+    lambda data: json.dumps(data, default=pydantic_encoder).encode()[::-1],
+    "application/x-reversed-json",
+)
+
+
+async def make_negotiating_client(aiohttp_client):
+    app = web.Application()
+    codec.register(app, REVERSED_JSON_CODEC)
+    app.router.add_view("/article", ArticleReturningView)
+    return await aiohttp_client(app)
+
+
+async def test_body_should_be_decoded_using_codec_of_content_type(
+    aiohttp_client, loop
+):
+    client = await make_negotiating_client(aiohttp_client)
+    resp = await client.post(
+        "/article",
+        data=b'{"name": "foo"}'[::-1],
+        headers={"Content-Type": "application/x-reversed-json"},
+    )
+    assert resp.status == 200
+    assert resp.content_type == "application/json"
+    assert resp.headers["Vary"] == "Accept"
+    assert await resp.json() == {"name": "foo"}
+
+
+async def test_response_should_be_encoded_using_codec_preferred_by_accept(
+    aiohttp_client, loop
+):
+    client = await make_negotiating_client(aiohttp_client)
+    resp = await client.post(
+        "/article",
+        json={"name": "foo"},
+        headers={"Accept": "application/json;q=0.5, application/x-reversed-json"},
+    )
+    assert resp.status == 200
+    assert resp.content_type == "application/x-reversed-json"
+    assert json.loads((await resp.read())[::-1]) == {"name": "foo"}
+
+    resp = await client.post(
+        "/article",
+        json={},
+        headers={"Accept": "application/x-reversed-json"},
+    )
+    assert resp.status == 418
+    assert resp.content_type == "application/x-reversed-json"
+    assert json.loads((await resp.read())[::-1])[0]["loc"] == ["name"]
+
+
+@pytest.mark.parametrize(
+    "accept",
+    ["*/*", "application/json", "text/html", "application/x-reversed-json;q=0"],
+)
+async def test_default_codec_should_be_used_if_no_registered_codec_is_preferred(
+    aiohttp_client, loop, accept
+):
+    client = await make_negotiating_client(aiohttp_client)
+    resp = await client.post(
+        "/article", json={"name": "foo"}, headers={"Accept": accept}
+    )
+    assert resp.status == 200
+    assert resp.content_type == "application/json"
+
+
+def test_registered_media_types_should_be_documented():
+    app = web.Application()
+    codec.register(app, REVERSED_JSON_CODEC)
+    app.router.add_view("/article", ArticleReturningView)
+    operation = generate_oas([app])["paths"]["/article"]["post"]
+
+    assert list(operation["requestBody"]["content"]) == [
+        "application/json",
+        "application/x-reversed-json",
+    ]
+    assert list(operation["responses"]["200"]["content"]) == [
+        "application/json",
+        "application/x-reversed-json",
+    ]
+
+
+@pytest.mark.parametrize(
+    "module_name, make_codec",
+    [("msgpack", codec.msgpack_codec), ("cbor2", codec.cbor_codec)],
+)
+def test_binary_codecs_should_encode_and_decode_models(module_name, make_codec):
+    pytest.importorskip(module_name)
+    binary_codec = make_codec()
+    encoded = binary_codec.dumps(ArticleModel(name="foo"))
+    assert isinstance(encoded, bytes)
+    assert binary_codec.loads(encoded) == {"name": "foo"}
+
+
+async def test_media_types_registered_on_parent_app_should_be_documented(
+    aiohttp_client, loop
+):
+    root = web.Application()
+    codec.register(root, REVERSED_JSON_CODEC)
+    sub = web.Application()
+    sub.router.add_view("/article", ArticleReturningView)
+    root.add_subapp("/sub", sub)
+    oas.setup(root, apps_to_expose=[sub])
+
+    client = await aiohttp_client(root)
+    resp = await client.post(
+        "/sub/article",
+        data=b'{"name": "foo"}'[::-1],
+        headers={"Content-Type": "application/x-reversed-json"},
+    )
+    assert resp.status == 200
+
+    resp = await client.get("/oas/spec")
+    operation = (await resp.json())["paths"]["/sub/article"]["post"]
+    assert list(operation["requestBody"]["content"]) == [
+        "application/json",
+        "application/x-reversed-json",
+    ]
@@ -0,0 +1,114 @@
+import asyncio
+import contextlib
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.view import compilation_stats, compile_views
+
+
+class ArticleModel(BaseModel):
+    name: str
+
+
+def make_app():
+    class ArticleView(PydanticView):
+        deferred_compilation = True
+
+        async def get(self, page: int = 1):
+            return web.json_response({"page": page})
+
+        async def post(self, article: ArticleModel):
+            return web.json_response({"name": article.name})
+
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+    return app
+
+
+def test_deferred_injectors_should_not_be_built_at_class_creation():
+    calls = []
+
+    class CountingView(PydanticView):
+        deferred_compilation = True
+
+        @classmethod
+        def parse_func_signature(cls, func):
+            calls.append(func.__name__)
+            return super().parse_func_signature(func)
+
+        async def get(self, page: int):
+            return web.json_response()
+
+    assert calls == []
+    CountingView.get.compile_injection_plan()
+    CountingView.get.compile_injection_plan()
+    assert calls == ["get"]
+
+
+def test_deferred_handler_with_invalid_signature_should_fail_at_class_creation():
+    with pytest.raises(RuntimeError):
+
+        class InvalidView(PydanticView):
+            deferred_compilation = True
+
+            async def get(self, page):
+                return web.json_response()
+
+
+async def test_deferred_injectors_should_be_built_on_first_request(
+    aiohttp_client, loop
+):
+    app = make_app()
+    assert compilation_stats([app]) == {
+        "compiled": 0,
+        "pending": 2,
+        "compile_time_ns": 0,
+    }
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/article", params={"page": "3"})
+    assert resp.status == 200
+    assert await resp.json() == {"page": 3}
+
+    resp = await client.get("/article", params={"page": "three"})
+    assert resp.status == 418
+    assert (await resp.json())[0]["in"] == "query string"
+
+    stats = compilation_stats([app])
+    assert (stats["compiled"], stats["pending"]) == (1, 1)
+    assert stats["compile_time_ns"] > 0
+
+
+async def test_compile_views_should_compile_pending_handlers(aiohttp_client, loop):
+    app = make_app()
+    stats = await compile_views([app])
+    assert (stats["compiled"], stats["pending"]) == (2, 0)
+    assert compilation_stats([app]) == stats
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", json={"name": "foo"})
+    assert await resp.json() == {"name": "foo"}
+
+
+async def test_compile_views_should_run_in_a_background_task(aiohttp_client, loop):
+    app = make_app()
+    tasks = []
+
+    async def warm_up(app):
+        task = asyncio.create_task(compile_views([app]))
+        tasks.append(task)
+        yield
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    app.cleanup_ctx.append(warm_up)
+    client = await aiohttp_client(app)
+    stats = await tasks[0]
+    assert (stats["compiled"], stats["pending"]) == (2, 0)
+
+    resp = await client.get("/article", params={"page": "3"})
+    assert await resp.json() == {"page": 3}
@@ -0,0 +1,58 @@
+from aiohttp import web
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView
+
+
+class ArticleModel(BaseModel):
+    name: str
+
+
+class ArticleView(PydanticView):
+    async def get(self):
+        return web.json_response({"articles": []})
+
+    async def post(self, article: ArticleModel, page: int):
+        return web.json_response({"name": article.name, "page": page})
+
+
+def test_handler_without_parameter_should_not_be_wrapped():
+    assert not hasattr(ArticleView.get, "__wrapped__")
+    assert hasattr(ArticleView.post, "__wrapped__")
+
+
+async def test_handler_without_parameter_should_be_called(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/article")
+    assert resp.status == 200
+    assert await resp.json() == {"articles": []}
+
+
+async def test_query_string_should_be_validated_before_body(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", params={"page": "foo"}, json={})
+    assert resp.status == 418
+    assert await resp.json() == [
+        {
+            "in": "query string",
+            "loc": ["page"],
+            "msg": "value is not a valid integer",
+            "type": "type_error.integer",
+        }
+    ]
+
+
+async def test_body_and_query_string_should_be_injected(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", params={"page": "2"}, json={"name": "foo"})
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo", "page": 2}
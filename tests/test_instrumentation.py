@@ -0,0 +1,160 @@
+from typing import AsyncIterator
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.instrumentation import (
+    Instrumentation,
+    PrometheusInstrumentation,
+)
+from aiohttp_pydantic.oas.typing import r200
+
+
+class RecordingInstrumentation(Instrumentation):
+    def __init__(self):
+        self.calls = []
+
+    def on_body_read(self, handler, duration_ns, size):
+        self.calls.append(("body read", handler, size))
+
+    def on_inject(self, handler, location, duration_ns):
+        self.calls.append(("inject", handler, location))
+
+    def on_validation_failure(self, handler, location):
+        self.calls.append(("failure", handler, location))
+
+    def on_handler(self, handler, duration_ns):
+        self.calls.append(("handler", handler))
+
+
+class ArticleModel(BaseModel):
+    name: str
+
+
+recording = RecordingInstrumentation()
+prometheus = PrometheusInstrumentation(duration_buckets=(1.0,))
+
+
+class ArticleView(PydanticView):
+    instrumentation = recording
+
+    async def get(self):
+        return web.json_response()
+
+    async def post(self, article: ArticleModel, page: int = 1):
+        return web.json_response({"name": article.name, "page": page})
+
+    async def put(self) -> r200[AsyncIterator[ArticleModel]]:
+        recording.calls.append(("iteration starts",))
+        for name in ("a", "b"):
+            yield ArticleModel(name=name)
+
+
+class MeasuredView(PydanticView):
+    instrumentation = prometheus
+
+    async def post(self, article: ArticleModel):
+        return web.json_response()
+
+
+class NotMeasuredView(PydanticView):
+    async def get(self):
+        return web.json_response()
+
+    async def post(self, article: ArticleModel):
+        return web.json_response()
+
+
+@pytest.fixture
+async def client(aiohttp_client, loop):
+    recording.calls.clear()
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+    app.router.add_view("/measured", MeasuredView)
+    app.router.add_get("/metrics", prometheus.handler)
+    return await aiohttp_client(app)
+
+
+def test_views_without_instrumentation_should_not_be_instrumented():
+    assert not hasattr(NotMeasuredView.get, "__wrapped__")
+    assert NotMeasuredView.post.__code__.co_name == "wrapped_handler"
+    assert ArticleView.get.__code__.co_name == "instrumented_handler"
+
+
+async def test_injectors_and_handler_should_be_measured(client):
+    resp = await client.post("/article", params={"page": "2"}, data=b'{"name": "a"}')
+    assert await resp.json() == {"name": "a", "page": 2}
+    resp = await client.get("/article")
+    assert resp.status == 200
+
+    assert recording.calls == [
+        ("inject", "ArticleView.post", "query string"),
+        ("body read", "ArticleView.post", 13),
+        ("inject", "ArticleView.post", "body"),
+        ("handler", "ArticleView.post"),
+        ("handler", "ArticleView.get"),
+    ]
+
+
+async def test_validation_failures_should_be_counted(client):
+    resp = await client.post("/article", params={"page": "a"}, json={"name": "a"})
+    assert resp.status == 418
+    resp = await client.post("/article", data=b"{")
+    assert resp.status == 400
+
+    assert [call for call in recording.calls if call[0] == "failure"] == [
+        ("failure", "ArticleView.post", "query string"),
+        ("failure", "ArticleView.post", "body"),
+    ]
+
+
+async def test_body_should_not_be_read_if_query_string_is_invalid(client):
+    resp = await client.post("/article", params={"page": "a"}, json={"name": "a"})
+    assert resp.status == 418
+    assert recording.calls == [
+        ("inject", "ArticleView.post", "query string"),
+        ("failure", "ArticleView.post", "query string"),
+    ]
+
+
+async def test_unsupported_content_encoding_should_be_rejected_before_reading(
+    client,
+):
+    resp = await client.post(
+        "/article", data=b"...", headers={"Content-Encoding": "compress"}
+    )
+    assert resp.status == 415
+    assert recording.calls == [
+        ("inject", "ArticleView.post", "query string"),
+        ("failure", "ArticleView.post", "body"),
+    ]
+
+
+async def test_async_generator_handler_should_be_measured(client):
+    resp = await client.put("/article")
+    assert resp.status == 200
+    assert await resp.json() == [{"name": "a"}, {"name": "b"}]
+    assert recording.calls == [("iteration starts",), ("handler", "ArticleView.put")]
+
+
+async def test_prometheus_instrumentation(client):
+    await client.post("/measured", json={"name": "a"})
+    await client.post("/measured", json={})
+
+    resp = await client.get("/metrics")
+    assert resp.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+    lines = (await resp.text()).splitlines()
+    labels = 'handler="MeasuredView.post"'
+    body_labels = f'{labels},location="body"'
+    assert "# TYPE aiohttp_pydantic_inject_seconds histogram" in lines
+    assert (
+        f'aiohttp_pydantic_inject_seconds_bucket{{{body_labels},le="1.0"}} 2' in lines
+    )
+    assert (
+        f'aiohttp_pydantic_inject_seconds_bucket{{{body_labels},le="+Inf"}} 2' in lines
+    )
+    assert f"aiohttp_pydantic_validation_failures_total{{{body_labels}}} 1" in lines
+    assert f"aiohttp_pydantic_body_size_bytes_sum{{{labels}}} 15" in lines
+    assert f"aiohttp_pydantic_handler_seconds_count{{{labels}}} 1" in lines
@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Optional
+
+from aiohttp import web
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.injectors import BodyGetter, RequestGetter
+
+
+class ArticleModel(BaseModel):
+    name: str
+
+
+class ArticleView(PydanticView):
+    merge_request_model = True
+
+    async def get(
+        self,
+        author_id: int,
+        /,
+        page: int,
+        size: Optional[int] = 10,
+        *,
+        signature_expired: datetime,
+    ):
+        return web.json_response(
+            {
+                "author_id": author_id,
+                "page": page,
+                "size": size,
+                "signature": signature_expired.isoformat(),
+            }
+        )
+
+    async def post(self, author_id: int, /, article: ArticleModel):
+        return web.json_response({"author_id": author_id, "name": article.name})
+
+
+def test_merged_view_should_use_a_single_request_injector():
+    injectors = ArticleView.parse_func_signature(ArticleView.get.__wrapped__)
+    assert [type(injector) for injector in injectors] == [RequestGetter]
+
+    injectors = ArticleView.parse_func_signature(ArticleView.post.__wrapped__)
+    assert [type(injector) for injector in injectors] == [RequestGetter, BodyGetter]
+
+
+async def test_merged_model_should_inject_path_query_string_and_headers(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/authors/{author_id}/articles", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get(
+        "/authors/12/articles",
+        params={"page": "3"},
+        headers={"Signature-Expired": "2020-10-04T18:01:00"},
+    )
+    assert resp.status == 200
+    assert await resp.json() == {
+        "author_id": 12,
+        "page": 3,
+        "size": 10,
+        "signature": "2020-10-04T18:01:00",
+    }
+
+
+async def test_merged_model_errors_should_report_their_location(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/authors/{author_id}/articles", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/authors/foo/articles", params={"page": "bar"})
+    assert resp.status == 418
+    assert await resp.json() == [
+        {
+            "in": "path",
+            "loc": ["author_id"],
+            "msg": "value is not a valid integer",
+            "type": "type_error.integer",
+        },
+        {
+            "in": "query string",
+            "loc": ["page"],
+            "msg": "value is not a valid integer",
+            "type": "type_error.integer",
+        },
+        {
+            "in": "headers",
+            "loc": ["signature_expired"],
+            "msg": "field required",
+            "type": "value_error.missing",
+        },
+    ]
+
+
+async def test_merged_model_should_inject_path_and_body(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/authors/{author_id}/articles", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/authors/12/articles", json={"name": "foo"})
+    assert resp.status == 200
+    assert await resp.json() == {"author_id": 12, "name": "foo"}
@@ -1,4 +1,5 @@
 import argparse
+import json
 from textwrap import dedent
 from io import StringIO
 from pathlib import Path
@@ -136,3 +137,50 @@ def test_show_oas_of_a_callable(cmd_line):
     )
 
     assert args.output.getvalue().strip() == expected.strip()
+
+
+def test_show_oas_of_apps_in_parallel(cmd_line):
+    apps = [
+        "tests.test_oas.test_cmd.sample:make_app()",
+        "tests.test_oas.test_cmd.sample",
+        "tests.test_oas.test_cmd.sample:sub_app",
+    ]
+    args = cmd_line.parse_args(apps)
+    args.output = StringIO()
+    args.func(args)
+    serial_output = args.output.getvalue()
+
+    args = cmd_line.parse_args([*apps, "--jobs", "2"])
+    args.output = StringIO()
+    args.func(args)
+    assert args.output.getvalue() == serial_output
+    assert list(json.loads(args.output.getvalue())["paths"]) == [
+        "/route-1/{a}",
+        "/route-3/{a}",
+        "/sub-app/route-2/{b}",
+    ]
+
+
+def test_show_compact_oas(cmd_line):
+    args = cmd_line.parse_args(["tests.test_oas.test_cmd.sample:sub_app", "-c"])
+    args.output = StringIO()
+    args.func(args)
+    assert args.output.getvalue() == (
+        '{"openapi":"3.0.0","paths":{"/sub-app/route-2/{b}":{"post":{"parameters":'
+        '[{"in":"path","name":"b","required":true,"schema":{"title":"b",'
+        '"type":"integer"}}]}}}}\n'
+    )
+
+
+def test_merge_specs():
+    assert cmd.merge_specs(
+        [
+            {"openapi": "3.0.0", "paths": {"/a": {"get": {"x": 1}}}},
+            {"openapi": "3.0.0", "paths": {"/a": {"post": {}}, "/b": {}}},
+            {"components": {"schemas": {"A": {"type": "object"}}}},
+        ]
+    ) == {
+        "openapi": "3.0.0",
+        "paths": {"/a": {"get": {"x": 1}, "post": {}}, "/b": {}},
+        "components": {"schemas": {"A": {"type": "object"}}},
+    }
@@ -0,0 +1,72 @@
+from typing import List, Optional
+from unittest import mock
+
+from aiohttp import web
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.oas import view as oas_view
+from aiohttp_pydantic.oas.typing import r200
+from aiohttp_pydantic.oas.view import _SchemaCache, generate_oas
+
+
+class Toy(BaseModel):
+    name: str
+
+
+class Pet(BaseModel):
+    name: str
+    toys: List[Toy]
+
+
+def make_view():
+    class PetView(PydanticView):
+        async def get(self, id: int, /, page: int = 1) -> r200[List[Pet]]:
+            return []
+
+        async def put(self, id: int, /, pet: Pet) -> r200[Pet]:
+            return pet
+
+    return PetView
+
+
+def test_shared_models_and_parameters_should_be_processed_once():
+    app = web.Application()
+    for i in range(10):
+        app.router.add_view(f"/pets-{i}/{{id}}", make_view())
+
+    with mock.patch.object(
+        oas_view, "_get_pydantic_schema", wraps=oas_view._get_pydantic_schema
+    ) as get_pydantic_schema:
+        spec = generate_oas([app])
+
+    # Pet, the path parameter id and the query parameter page.
+    assert get_pydantic_schema.call_count == 3
+    assert spec["paths"]["/pets-3/{id}"] == spec["paths"]["/pets-7/{id}"]
+    assert spec["components"]["schemas"]["Pet"]["properties"]["toys"] == {
+        "title": "Toys",
+        "type": "array",
+        "items": {"$ref": "#/components/schemas/Toy"},
+    }
+
+
+def test_returned_schemas_should_be_copies():
+    schemas = _SchemaCache()
+    schema, _ = schemas.model_schema(Pet)
+    schema["description"] = "mutated"
+    assert "description" not in schemas.model_schema(Pet)[0]
+
+
+def test_parameters_with_equal_defaults_of_different_types_should_differ():
+    schemas = _SchemaCache()
+    assert schemas.parameter_schema("flag", int, 1)[0]["default"] == 1
+    assert schemas.parameter_schema("flag", int, True)[0]["default"] is True
+    assert "default" not in schemas.parameter_schema("flag", int)[0]
+    assert schemas.parameter_schema("other", int, 1)[0]["title"] == "other"
+
+
+def test_parameters_with_unhashable_defaults_should_not_be_cached():
+    schemas = _SchemaCache()
+    schema, _ = schemas.parameter_schema("tags", Optional[List[str]], ["a"])
+    assert schema["default"] == ["a"]
+    assert schemas._parameters == {}
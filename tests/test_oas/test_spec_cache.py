@@ -0,0 +1,135 @@
+import gzip
+
+import pytest
+from aiohttp import web
+
+from aiohttp_pydantic import PydanticView, oas
+from aiohttp_pydantic.oas import view as oas_view
+
+
+class ArticleView(PydanticView):
+    async def get(self, page: int):
+        return web.json_response()
+
+
+@pytest.fixture
+async def client(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+    oas.setup(app)
+    return await aiohttp_client(app, auto_decompress=False)
+
+
+def count_documented_operations(monkeypatch):
+    calls = []
+    add_http_method_to_oas = oas_view._add_http_method_to_oas
+
+    def counting_add_http_method_to_oas(oas, oas_path, http_method, *args):
+        calls.append(http_method)
+        return add_http_method_to_oas(oas, oas_path, http_method, *args)
+
+    monkeypatch.setattr(
+        oas_view, "_add_http_method_to_oas", counting_add_http_method_to_oas
+    )
+    return calls
+
+
+async def test_spec_should_be_generated_once(client, monkeypatch):
+    calls = count_documented_operations(monkeypatch)
+    first = await client.get("/oas/spec")
+    second = await client.get("/oas/spec")
+    assert first.status == second.status == 200
+    assert await first.read() == await second.read()
+    assert calls == ["get"]
+
+
+async def test_spec_should_document_routes_added_to_exposed_app(
+    aiohttp_client, loop, monkeypatch
+):
+    plugins = web.Application()
+    plugins.router.add_view("/plugin-1", ArticleView)
+    app = web.Application()
+    oas.setup(app, apps_to_expose=[plugins])
+    client = await aiohttp_client(app)
+    calls = count_documented_operations(monkeypatch)
+
+    first = await client.get("/oas/spec")
+    assert list((await first.json())["paths"]) == ["/plugin-1"]
+
+    plugins.router.add_view("/plugin-2", ArticleView)
+    second = await client.get("/oas/spec")
+    assert list((await second.json())["paths"]) == ["/plugin-1", "/plugin-2"]
+    assert first.headers["ETag"] != second.headers["ETag"]
+    assert calls == ["get", "get"]
+
+    third = await client.get("/oas/spec")
+    assert third.headers["ETag"] == second.headers["ETag"]
+    assert calls == ["get", "get"]
+
+
+def test_builder_should_only_document_new_and_changed_routes(monkeypatch):
+    class OtherView(PydanticView):
+        async def get(self, size: int):
+            return web.json_response()
+
+        async def post(self, size: int):
+            return web.json_response()
+
+    app = web.Application()
+    app.router.add_route("GET", "/article", ArticleView)
+    apps = [app]
+    builder = oas_view._OASBuilder(apps)
+    calls = count_documented_operations(monkeypatch)
+
+    assert builder.update() is True
+    assert builder.update() is False
+    app.router.add_post("/other", OtherView)
+    assert builder.update() is True
+    assert calls == ["get", "post"]
+    assert builder.spec == oas_view.generate_oas(apps)
+    calls.clear()
+
+    other_app = web.Application()
+    other_app.router.add_route("GET", "/article", OtherView)
+    apps[0] = other_app
+    assert builder.update() is True
+    assert calls == ["get"]
+    assert builder.spec["paths"] == oas_view.generate_oas(apps)["paths"]
+
+
+def test_builder_should_not_scan_frozen_routers(monkeypatch):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+    app.freeze()
+    builder = oas_view._OASBuilder([app])
+    assert builder.update() is True
+
+    monkeypatch.setattr(builder, "_routes", None)
+    assert builder.update() is False
+
+
+async def test_spec_with_matching_etag_should_return_not_modified(client):
+    resp = await client.get("/oas/spec")
+    etag = resp.headers["ETag"]
+    assert resp.headers["Vary"] == "Accept-Encoding"
+
+    resp = await client.get("/oas/spec", headers={"If-None-Match": etag})
+    assert resp.status == 304
+    assert resp.headers["ETag"] == etag
+
+    resp = await client.get("/oas/spec", headers={"If-None-Match": '"other"'})
+    assert resp.status == 200
+
+
+async def test_spec_should_be_gzip_compressed_when_accepted(client):
+    identity = await client.get("/oas/spec", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+
+    resp = await client.get("/oas/spec", headers={"Accept-Encoding": "gzip"})
+    assert resp.status == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.content_type == "application/json"
+    assert gzip.decompress(await resp.read()) == await identity.read()
+
+    resp = await client.get("/oas/spec", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in resp.headers
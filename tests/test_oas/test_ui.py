@@ -0,0 +1,77 @@
+import subprocess
+import sys
+
+from aiohttp import web
+
+from aiohttp_pydantic import oas
+from aiohttp_pydantic.oas.view import _swagger_ui_path
+
+
+async def test_index_page_should_link_the_spec_and_static_files(aiohttp_client, loop):
+    app = web.Application()
+    oas.setup(app)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/oas")
+    assert resp.status == 200
+    assert resp.content_type == "text/html"
+    assert resp.headers["Cache-Control"] == "public, max-age=300"
+    page = await resp.text()
+    origin = f"http://127.0.0.1:{client.port}"
+    version = _swagger_ui_path().name
+    assert f'url: "{origin}/oas/spec"' in page
+    assert f'src="{origin}/oas/static/{version}/swagger-ui-bundle.js"' in page
+
+
+async def test_index_page_should_be_rendered_once_per_origin(aiohttp_client, loop):
+    app = web.Application()
+    oas.setup(app)
+
+    client = await aiohttp_client(app)
+    first = await client.get("/oas")
+    second = await client.get("/oas", headers={"Host": "example.com"})
+    third = await client.get("/oas")
+    assert await first.text() == await third.text() != await second.text()
+    assert first.headers["ETag"] == third.headers["ETag"] != second.headers["ETag"]
+
+    index_template = app._subapps[0]["index template"]
+    cache_info = index_template.render_page.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (1, 2)
+
+    resp = await client.get("/oas", headers={"If-None-Match": first.headers["ETag"]})
+    assert resp.status == 304
+
+
+async def test_static_files_should_be_served(aiohttp_client, loop):
+    app = web.Application()
+    oas.setup(app)
+    version = _swagger_ui_path().name
+
+    client = await aiohttp_client(app)
+    resp = await client.get(f"/oas/static/{version}/swagger-ui.css")
+    assert resp.status == 200
+    assert resp.content_type == "text/css"
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    resp = await client.get("/oas/static/swagger-ui-0.0.0/swagger-ui.css")
+    assert resp.status == 404
+
+    resp = await client.get(f"/oas/static/{version}/not-found.css")
+    assert resp.status == 404
+
+    resp = await client.get(f"/oas/static/{version}/%2E%2E/%2E%2E/__init__.py")
+    assert resp.status == 404
+
+
+def test_oas_dependencies_should_be_imported_on_first_use():
+    code = (
+        "import sys;"
+        "from aiohttp import web;"
+        "from aiohttp_pydantic import PydanticView, oas;"
+        "oas.setup(web.Application());"
+        "print(sorted({'jinja2', 'swagger_ui_bundle'} & set(sys.modules)))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
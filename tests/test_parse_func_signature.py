@@ -1,5 +1,8 @@
+from functools import wraps
+from typing import AsyncIterator
 from uuid import UUID
 
+import pytest
 from pydantic import BaseModel
 
 from aiohttp_pydantic.injectors import _parse_func_signature
@@ -38,7 +41,17 @@ def test_parse_func_signature():
     def path_body_qs_and_header(self, id: str, /, user: User, page: int, *, auth: UUID):
         pass
 
+    def body_stream_only(self, users: AsyncIterator[User]):
+        pass
+
     assert _parse_func_signature(body_only) == ({}, {"user": User}, {}, {}, {})
+    assert _parse_func_signature(body_stream_only) == (
+        {},
+        {"users": AsyncIterator[User]},
+        {},
+        {},
+        {},
+    )
     assert _parse_func_signature(path_only) == ({"id": str}, {}, {}, {}, {})
     assert _parse_func_signature(qs_only) == ({}, {}, {"page": int}, {}, {})
     assert _parse_func_signature(header_only) == ({}, {}, {}, {"auth": UUID}, {})
@@ -77,3 +90,20 @@ def test_parse_func_signature():
         {"auth": UUID},
         {},
     )
+
+
+def test_parse_func_signature_should_be_cached_and_read_only():
+    def handler(self, id: str, /, page: int = 1):
+        pass
+
+    @wraps(handler)
+    def decorated_handler(*args, **kwargs):
+        return handler(*args, **kwargs)
+
+    parsed = _parse_func_signature(handler)
+    assert _parse_func_signature(handler) is parsed
+    assert _parse_func_signature(decorated_handler) is parsed
+    assert parsed.qs_args == {"page": int}
+    assert parsed.defaults == {"page": 1}
+    with pytest.raises(TypeError):
+        parsed.qs_args["page"] = str
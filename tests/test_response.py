@@ -0,0 +1,300 @@
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Union
+
+import aiohttp
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView, oas
+from aiohttp_pydantic.oas.typing import r200, r201, r204, r404
+
+
+class Pet(BaseModel):
+    id: int
+    name: str
+    birthday: datetime
+
+
+class Error(BaseModel):
+    error: str
+
+
+PETS = {1: Pet(id=1, name="Rex", birthday=datetime(2020, 1, 2, 3, 4, 5))}
+
+
+class PetCollectionView(PydanticView):
+    async def get(self) -> r200[List[Pet]]:
+        return list(PETS.values())
+
+    async def post(self, pet: Pet) -> r201[Pet]:
+        return pet
+
+
+class PetItemView(PydanticView):
+    async def get(self, id: int, /) -> Union[r200[Pet], r404[Error]]:
+        if id not in PETS:
+            return Error(error=f"Pet {id} does not exist")
+        return PETS[id]
+
+    async def delete(self, id: int, /) -> r204:
+        return None
+
+    async def put(self, id: int, /):
+        return web.json_response({"id": id}, status=202)
+
+
+async def test_returned_model_list_should_be_encoded(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/pets", PetCollectionView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/pets")
+    assert resp.status == 200
+    assert resp.content_type == "application/json"
+    assert await resp.json() == [
+        {"id": 1, "name": "Rex", "birthday": "2020-01-02T03:04:05"}
+    ]
+
+
+async def test_returned_model_should_use_the_annotated_status_code(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/pets", PetCollectionView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post(
+        "/pets", json={"id": 2, "name": "Pif", "birthday": "2021-01-02T03:04:05"}
+    )
+    assert resp.status == 201
+    assert await resp.json() == {
+        "id": 2,
+        "name": "Pif",
+        "birthday": "2021-01-02T03:04:05",
+    }
+
+
+async def test_status_code_should_be_selected_from_the_returned_type(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/pets/{id}", PetItemView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/pets/1")
+    assert resp.status == 200
+    assert (await resp.json())["name"] == "Rex"
+
+    resp = await client.get("/pets/3")
+    assert resp.status == 404
+    assert await resp.json() == {"error": "Pet 3 does not exist"}
+
+
+async def test_returned_none_should_give_an_empty_response(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/pets/{id}", PetItemView)
+
+    client = await aiohttp_client(app)
+    resp = await client.delete("/pets/1")
+    assert resp.status == 204
+    assert await resp.read() == b""
+
+
+class UnannotatedView(PydanticView):
+    async def get(self):
+        return None
+
+    async def post(self):
+        return {"id": 1}
+
+
+class EncodedView(PydanticView):
+    encode_responses = True
+
+    async def get(self):
+        return {"id": 1}
+
+    async def post(self) -> r200[Pet]:
+        return None
+
+
+async def test_data_returned_without_annotation_should_not_be_encoded(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/unannotated", UnannotatedView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/unannotated")
+    assert resp.status == 500
+    resp = await client.post("/unannotated")
+    assert resp.status == 500
+
+
+async def test_data_returned_without_annotation_should_be_encoded_on_demand(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/encoded", EncodedView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/encoded")
+    assert resp.status == 200
+    assert await resp.json() == {"id": 1}
+
+
+async def test_returned_none_without_empty_status_code_should_fail(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/encoded", EncodedView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/encoded")
+    assert resp.status == 500
+
+
+async def test_returned_response_should_be_kept(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/pets/{id}", PetItemView)
+
+    client = await aiohttp_client(app)
+    resp = await client.put("/pets/1")
+    assert resp.status == 202
+    assert await resp.json() == {"id": 1}
+
+
+class PetExportView(PydanticView):
+    async def get(self, count: int = 3) -> r200[AsyncIterator[Pet]]:
+        for i in range(count):
+            yield Pet(id=i, name=f"pet {i}", birthday=datetime(2020, 1, 2))
+
+
+async def test_returned_async_iterator_should_be_streamed_as_json_array(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/pets", PetExportView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/pets", params={"count": 2})
+    assert resp.status == 200
+    assert resp.content_type == "application/json"
+    assert resp.headers["Transfer-Encoding"] == "chunked"
+    assert await resp.json() == [
+        {"id": 0, "name": "pet 0", "birthday": "2020-01-02T00:00:00"},
+        {"id": 1, "name": "pet 1", "birthday": "2020-01-02T00:00:00"},
+    ]
+
+    resp = await client.get("/pets", params={"count": 0})
+    assert await resp.json() == []
+
+
+async def test_returned_async_iterator_should_be_streamed_as_ndjson(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/pets", PetExportView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get(
+        "/pets", params={"count": 5000}, headers={"Accept": "application/x-ndjson"}
+    )
+    assert resp.status == 200
+    assert resp.content_type == "application/x-ndjson"
+    lines = (await resp.text()).splitlines()
+    assert len(lines) == 5000
+    assert json.loads(lines[-1]) == {
+        "id": 4999,
+        "name": "pet 4999",
+        "birthday": "2020-01-02T00:00:00",
+    }
+
+
+class PetImportView(PydanticView):
+    async def post(self, pets: AsyncIterator[Pet]) -> r200[AsyncIterator[Pet]]:
+        # Two pets are validated before the first one is sent.
+        pair = []
+        async for pet in pets:
+            pair.append(pet)
+            if len(pair) == 2:
+                yield pair.pop(0)
+        for pet in pair:
+            yield pet
+
+
+def pet_data(id):
+    return {"id": id, "name": f"pet {id}", "birthday": "2020-01-02T00:00:00"}
+
+
+async def test_invalid_streamed_body_before_first_item_should_be_rejected(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/pets", PetImportView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/pets", json=[pet_data(1), {"id": 2}, pet_data(3)])
+    assert resp.status == 418
+    errors = await resp.json()
+    assert [error["loc"] for error in errors] == [[1, "name"], [1, "birthday"]]
+
+    resp = await client.post("/pets", json=[pet_data(1), pet_data(2)])
+    assert resp.status == 200
+    assert await resp.json() == [pet_data(1), pet_data(2)]
+
+
+async def test_invalid_streamed_body_after_first_item_should_abort_the_stream(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/pets", PetImportView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/pets", json=[pet_data(1), pet_data(2), {"id": 3}])
+    assert resp.status == 200
+    with pytest.raises(aiohttp.ClientPayloadError):
+        await resp.read()
+
+
+@pytest.mark.parametrize(
+    "accept, content_type",
+    [
+        ("application/x-ndjson;q=0", "application/json"),
+        ("application/x-ndjson;q=0.5, application/json", "application/json"),
+        ("application/json;q=0.5, application/x-ndjson", "application/x-ndjson"),
+        ("text/html, Application/X-NDJSON", "application/x-ndjson"),
+        ("*/*", "application/json"),
+        ("application/ndjson", "application/ndjson"),
+        ("application/jsonl;q=0.9, application/json;q=0.1", "application/jsonl"),
+    ],
+)
+async def test_streamed_format_should_be_negotiated_with_accept_qualities(
+    aiohttp_client, loop, accept, content_type
+):
+    app = web.Application()
+    app.router.add_view("/pets", PetExportView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/pets", params={"count": 1}, headers={"Accept": accept})
+    assert resp.status == 200
+    assert resp.content_type == content_type
+
+
+async def test_streamed_response_should_be_documented_as_an_array(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/pets", PetExportView)
+    oas.setup(app)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/oas/spec")
+    response = (await resp.json())["paths"]["/pets"]["get"]["responses"]["200"]
+    pet_ref = {"$ref": "#/components/schemas/Pet"}
+    assert response["content"] == {
+        "application/json": {"schema": {"type": "array", "items": pet_ref}},
+        "application/x-ndjson": {"schema": pet_ref},
+    }
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from aiohttp import web
 from pydantic import BaseModel
@@ -11,11 +11,20 @@ class ArticleModel(BaseModel):
     nb_page: Optional[int]
 
 
+class ArticleModels(BaseModel):
+    __root__: List[ArticleModel]
+
+
 class ArticleView(PydanticView):
     async def post(self, article: ArticleModel):
         return web.json_response(article.dict())
 
 
+class ArticlesView(PydanticView):
+    async def post(self, articles: ArticleModels):
+        return web.json_response([article.dict() for article in articles.__root__])
+
+
 async def test_post_an_article_without_required_field_should_return_an_error_message(
     aiohttp_client, loop
 ):
@@ -65,3 +74,38 @@ async def test_post_a_valid_article_should_return_the_parsed_type(aiohttp_client
     assert resp.status == 200
     assert resp.content_type == "application/json"
     assert await resp.json() == {"name": "foo", "nb_page": 3}
+
+
+async def test_post_an_article_list_should_return_the_parsed_type(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/articles", ArticlesView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/articles", json=[{"name": "foo"}, {"name": "bar"}])
+    assert resp.status == 200
+    assert await resp.json() == [
+        {"name": "foo", "nb_page": None},
+        {"name": "bar", "nb_page": None},
+    ]
+
+
+async def test_post_a_list_instead_of_an_article_should_return_an_error_message(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", json=[{"name": "foo"}])
+    assert resp.status == 418
+    assert resp.content_type == "application/json"
+    assert await resp.json() == [
+        {
+            "in": "body",
+            "loc": ["__root__"],
+            "msg": "ArticleModel expected dict not list",
+            "type": "type_error",
+        }
+    ]
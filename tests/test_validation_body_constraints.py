@@ -0,0 +1,234 @@
+import gzip
+from typing import AsyncIterator, List
+
+from aiohttp import compression_utils, web
+from pydantic import BaseModel
+from typing_extensions import Annotated
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.injectors import (
+    SUPPORTED_CONTENT_ENCODINGS,
+    BodyConstraints,
+    _supported_content_encodings,
+)
+from aiohttp_pydantic.oas.view import generate_oas
+
+
+class ArticleModel(BaseModel):
+    name: str
+    tags: List[str] = []
+
+
+class ArticleView(PydanticView):
+    async def post(
+        self,
+        article: Annotated[
+            ArticleModel,
+            BodyConstraints(
+                max_bytes=64,
+                content_type=("application/json", "application/merge-patch+json"),
+                max_depth=2,
+                max_items=4,
+            ),
+        ],
+    ):
+        return web.json_response({"name": article.name})
+
+
+class LargeArticleView(PydanticView):
+    async def post(self, article: Annotated[ArticleModel, BodyConstraints(10**6)]):
+        return web.json_response({"tags": len(article.tags)})
+
+
+class ArticlesView(PydanticView):
+    async def post(
+        self,
+        articles: Annotated[
+            AsyncIterator[ArticleModel], BodyConstraints(max_bytes=64, max_items=2)
+        ],
+    ):
+        names = []
+        async for article in articles:
+            names.append(article.name)
+        return web.json_response(names)
+
+
+class EchoArticleView(PydanticView):
+    async def post(self, article: Annotated[ArticleModel, BodyConstraints(1000)]):
+        return web.json_response(
+            {"name": article.name, "body": await self.request.text()}
+        )
+
+
+async def make_client(aiohttp_client):
+    app = web.Application(client_max_size=1024)
+    app.router.add_view("/article", ArticleView)
+    app.router.add_view("/large-article", LargeArticleView)
+    app.router.add_view("/articles", ArticlesView)
+    return await aiohttp_client(app)
+
+
+async def test_valid_body_should_be_injected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/article", json={"name": "foo", "tags": ["a"]})
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo"}
+
+
+async def test_unexpected_content_type_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post(
+        "/article", data=b'{"name": "foo"}', headers={"Content-Type": "text/plain"}
+    )
+    assert resp.status == 415
+    assert await resp.json() == {
+        "error": "Unsupported Content-Type",
+        "expected": ["application/json", "application/merge-patch+json"],
+    }
+
+
+async def test_large_content_length_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/article", json={"name": "a" * 100})
+    assert resp.status == 413
+
+
+async def test_large_chunked_body_should_be_rejected(aiohttp_client, loop):
+    async def chunks():
+        yield b'{"name": "'
+        for _ in range(10):
+            yield b"a" * 10
+        yield b'"}'
+
+    client = await make_client(aiohttp_client)
+    resp = await client.post(
+        "/article", data=chunks(), headers={"Content-Type": "application/json"}
+    )
+    assert resp.status == 413
+
+
+async def test_max_bytes_should_replace_client_max_size(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post(
+        "/large-article", json={"name": "foo", "tags": ["tag"] * 1000}
+    )
+    assert resp.status == 200
+    assert await resp.json() == {"tags": 1000}
+
+
+async def test_deeply_nested_body_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/article", json={"name": "foo", "tags": [["a"]]})
+    assert resp.status == 413
+    assert await resp.json() == {"error": "Body nested too deeply"}
+
+
+async def test_body_with_too_many_items_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/article", json={"name": "foo", "tags": ["a"] * 4})
+    assert resp.status == 413
+    assert await resp.json() == {"error": "Too many items in body"}
+
+
+async def test_streamed_body_should_be_limited(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/articles", json=[{"name": "a"}, {"name": "b"}])
+    assert resp.status == 200
+    assert await resp.json() == ["a", "b"]
+
+    resp = await client.post("/articles", json=[{"name": "a"}] * 3)
+    assert resp.status == 413
+
+    resp = await client.post("/articles", json=[{"name": "a" * 100}])
+    assert resp.status == 413
+
+
+def test_oas_should_list_the_accepted_content_types():
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+    app.router.add_view("/large-article", LargeArticleView)
+    paths = generate_oas([app])["paths"]
+    assert list(paths["/article"]["post"]["requestBody"]["content"]) == [
+        "application/json",
+        "application/merge-patch+json",
+    ]
+    assert paths["/large-article"]["post"]["requestBody"]["content"][
+        "application/json"
+    ]["schema"]["title"] == "ArticleModel"
+
+
+async def test_compressed_body_should_be_decompressed(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post(
+        "/large-article",
+        data=gzip.compress(b'{"name": "foo", "tags": ["a", "b"]}'),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert resp.status == 200
+    assert await resp.json() == {"tags": 2}
+
+
+async def test_decompressed_size_should_be_limited(aiohttp_client, loop):
+    body = b'{"name": "foo", "tags": ["' + b"a" * 2 * 10**6 + b'"]}'
+    compressed_body = gzip.compress(body)
+    assert len(compressed_body) < 10**6
+
+    client = await make_client(aiohttp_client)
+    resp = await client.post(
+        "/large-article",
+        data=compressed_body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert resp.status == 413
+
+
+async def test_unsupported_content_encoding_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post(
+        "/article",
+        data=b"...",
+        headers={"Content-Type": "application/json", "Content-Encoding": "compress"},
+    )
+    assert resp.status == 415
+    assert resp.headers["Accept-Encoding"] == ", ".join(
+        sorted(SUPPORTED_CONTENT_ENCODINGS)
+    )
+    assert (await resp.json())["error"] == "Unsupported Content-Encoding"
+
+
+def test_supported_content_encodings_should_follow_the_aiohttp_flags(monkeypatch):
+    monkeypatch.setattr(compression_utils, "HAS_BROTLI", True, raising=False)
+    monkeypatch.delattr(compression_utils, "HAS_ZSTD", raising=False)
+    assert _supported_content_encodings() == {"identity", "gzip", "deflate", "br"}
+
+    monkeypatch.setattr(compression_utils, "HAS_BROTLI", False)
+    monkeypatch.setattr(compression_utils, "HAS_ZSTD", True, raising=False)
+    assert _supported_content_encodings() == {"identity", "gzip", "deflate", "zstd"}
+
+
+async def test_body_should_be_readable_after_injection(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/article", EchoArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", data='{"name": "foo"}')
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo", "body": '{"name": "foo"}'}
+
+
+async def test_body_read_by_a_middleware_should_be_injected(aiohttp_client, loop):
+    @web.middleware
+    async def read_body(request, handler):
+        await request.read()
+        return await handler(request)
+
+    app = web.Application(middlewares=[read_body])
+    app.router.add_view("/article", EchoArticleView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/article", data='{"name": "foo"}')
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo", "body": '{"name": "foo"}'}
+
+    resp = await client.post("/article", data='{"name": "' + "x" * 1000 + '"}')
+    assert resp.status == 413
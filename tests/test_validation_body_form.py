@@ -0,0 +1,275 @@
+from typing import List, Optional
+
+import aiohttp
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+from typing_extensions import Annotated
+
+from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.form import Form, UploadFile
+from aiohttp_pydantic.injectors import BodyConstraints
+from aiohttp_pydantic.oas.view import generate_oas
+
+
+class ArticleForm(BaseModel):
+    name: str
+    nb_page: int = 1
+    tags: List[str] = []
+
+
+class UploadForm(BaseModel):
+    title: str
+    document: UploadFile
+    attachments: List[UploadFile] = []
+    thumbnail: Optional[UploadFile] = None
+
+
+class ArticleView(PydanticView):
+    async def post(self, article: Annotated[ArticleForm, Form()]):
+        return web.json_response(article.dict())
+
+
+class UploadView(PydanticView):
+    async def post(
+        self,
+        upload: Annotated[UploadForm, Form(max_memory_size=16, max_field_size=32)],
+    ):
+        document = upload.document
+        content = b"".join([chunk async for chunk in document.chunks(8)])
+        document.close()
+        return web.json_response(
+            {
+                "title": upload.title,
+                "filename": document.filename,
+                "content_type": document.content_type,
+                "size": document.size,
+                "content": content.decode(),
+                "attachments": [
+                    (await attachment.read()).decode()
+                    for attachment in upload.attachments
+                ],
+            }
+        )
+
+
+class LimitedArticleView(PydanticView):
+    async def post(
+        self, article: Annotated[ArticleForm, Form(), BodyConstraints(max_bytes=512)]
+    ):
+        return web.json_response(
+            {"name": article.name, "body": await self.request.text()}
+        )
+
+
+class LimitedUploadView(PydanticView):
+    async def post(
+        self, upload: Annotated[UploadForm, Form(), BodyConstraints(max_bytes=512)]
+    ):
+        return web.json_response({"size": upload.document.size})
+
+
+class FewFieldsArticleView(PydanticView):
+    async def post(
+        self, article: Annotated[ArticleForm, Form(), BodyConstraints(max_items=3)]
+    ):
+        return web.json_response(article.dict())
+
+
+async def make_client(aiohttp_client):
+    app = web.Application(client_max_size=1024)
+    app.router.add_view("/article", ArticleView)
+    app.router.add_view("/upload", UploadView)
+    app.router.add_view("/limited-upload", LimitedUploadView)
+    app.router.add_view("/few-fields-article", FewFieldsArticleView)
+    return await aiohttp_client(app)
+
+
+def upload_data(document=b"hello", title="Report"):
+    data = aiohttp.FormData()
+    data.add_field("title", title)
+    data.add_field(
+        "document", document, filename="report.txt", content_type="text/plain"
+    )
+    return data
+
+
+async def test_urlencoded_form_should_be_injected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post(
+        "/article", data=[("name", "foo"), ("tags", "a"), ("tags", "b")]
+    )
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo", "nb_page": 1, "tags": ["a", "b"]}
+
+
+async def test_limited_urlencoded_form_read_by_a_middleware_should_be_injected(
+    aiohttp_client, loop
+):
+    @web.middleware
+    async def read_body(request, handler):
+        await request.read()
+        return await handler(request)
+
+    for middlewares in ([], [read_body]):
+        app = web.Application(middlewares=middlewares)
+        app.router.add_view("/article", LimitedArticleView)
+
+        client = await aiohttp_client(app)
+        resp = await client.post("/article", data={"name": "foo"})
+        assert resp.status == 200
+        assert await resp.json() == {"name": "foo", "body": "name=foo"}
+
+
+async def test_multipart_form_without_file_should_be_injected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    data = aiohttp.FormData()
+    fields = (("name", "foo"), ("nb_page", "3"), ("tags", "a"), ("tags", "b"))
+    for name, value in fields:
+        data.add_field(name, value, content_type="text/plain; charset=utf-8")
+    assert data.is_multipart
+    resp = await client.post("/article", data=data)
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo", "nb_page": 3, "tags": ["a", "b"]}
+
+
+async def test_invalid_form_should_return_validation_errors(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/article", data={"nb_page": "x"})
+    assert resp.status == 418
+    assert await resp.json() == [
+        {
+            "in": "body",
+            "loc": ["name"],
+            "msg": "field required",
+            "type": "value_error.missing",
+        },
+        {
+            "in": "body",
+            "loc": ["nb_page"],
+            "msg": "value is not a valid integer",
+            "type": "type_error.integer",
+        },
+    ]
+
+
+async def test_json_body_should_be_rejected_by_form(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/article", json={"name": "foo"})
+    assert resp.status == 415
+    assert await resp.json() == {
+        "error": "Unsupported Content-Type",
+        "expected": ["multipart/form-data", "application/x-www-form-urlencoded"],
+    }
+
+
+async def test_uploaded_files_should_be_injected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    data = upload_data(b"0123456789" * 5)
+    data.add_field("attachments", b"first", filename="1.txt")
+    data.add_field("attachments", b"second", filename="2.txt")
+    resp = await client.post("/upload", data=data)
+    assert resp.status == 200
+    assert await resp.json() == {
+        "title": "Report",
+        "filename": "report.txt",
+        "content_type": "text/plain",
+        "size": 50,
+        "content": "0123456789" * 5,
+        "attachments": ["first", "second"],
+    }
+
+
+async def test_uploaded_file_larger_than_client_max_size_should_be_accepted(
+    aiohttp_client, loop
+):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/upload", data=upload_data(b"x" * 4096))
+    assert resp.status == 200
+    assert (await resp.json())["size"] == 4096
+
+
+async def test_missing_file_should_return_validation_errors(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    data = aiohttp.FormData()
+    data.add_field("title", "Report")
+    data.add_field("document", "not a file")
+    resp = await client.post("/upload", data=data)
+    assert resp.status == 418
+    assert await resp.json() == [
+        {
+            "in": "body",
+            "loc": ["document"],
+            "msg": "value is not an uploaded file",
+            "type": "type_error",
+        }
+    ]
+
+
+async def test_too_large_field_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/upload", data=upload_data(title="x" * 33))
+    assert resp.status == 413
+    assert await resp.json() == {"error": "Field title too large"}
+
+
+async def test_too_large_form_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    resp = await client.post("/limited-upload", data=upload_data(b"x" * 1024))
+    assert resp.status == 413
+
+    resp = await client.post("/limited-upload", data=upload_data(b"x" * 64))
+    assert resp.status == 200
+    assert await resp.json() == {"size": 64}
+
+
+async def test_form_with_too_many_fields_should_be_rejected(aiohttp_client, loop):
+    client = await make_client(aiohttp_client)
+    fields = [("name", "foo"), ("tags", "a"), ("tags", "b"), ("tags", "c")]
+    resp = await client.post("/few-fields-article", data=fields)
+    assert resp.status == 413
+    assert await resp.json() == {"error": "Too many items in body"}
+
+    data = aiohttp.FormData()
+    for name, value in fields:
+        data.add_field(name, value, content_type="text/plain; charset=utf-8")
+    resp = await client.post("/few-fields-article", data=data)
+    assert resp.status == 413
+    assert await resp.json() == {"error": "Too many items in body"}
+
+    resp = await client.post("/few-fields-article", data=fields[:3])
+    assert resp.status == 200
+    assert await resp.json() == {"name": "foo", "nb_page": 1, "tags": ["a", "b"]}
+
+
+def test_form_should_reject_the_constraints_of_nested_bodies():
+    with pytest.raises(RuntimeError):
+
+        class NestedArticleView(PydanticView):
+            async def post(
+                self,
+                article: Annotated[ArticleForm, Form(), BodyConstraints(max_depth=2)],
+            ):
+                return web.json_response(article.dict())
+
+
+async def test_form_content_types_should_be_documented(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+    app.router.add_view("/upload", UploadView)
+    oas = generate_oas([app])
+
+    article_body = oas["paths"]["/article"]["post"]["requestBody"]["content"]
+    assert list(article_body) == [
+        "multipart/form-data",
+        "application/x-www-form-urlencoded",
+    ]
+
+    upload_body = oas["paths"]["/upload"]["post"]["requestBody"]["content"]
+    assert list(upload_body) == ["multipart/form-data"]
+    properties = upload_body["multipart/form-data"]["schema"]["properties"]
+    assert properties["document"] == {
+        "title": "Document",
+        "type": "string",
+        "format": "binary",
+    }
@@ -0,0 +1,208 @@
+import json
+from typing import AsyncIterator
+
+from aiohttp import web
+from pydantic import BaseModel
+from typing_extensions import Annotated
+
+from aiohttp_pydantic import PydanticView, oas
+from aiohttp_pydantic.injectors import BodyConstraints
+
+
+class ItemModel(BaseModel):
+    name: str
+    quantity: int
+
+
+class BulkView(PydanticView):
+    async def post(self, items: AsyncIterator[ItemModel]):
+        total = 0
+        names = []
+        async for item in items:
+            total += item.quantity
+            names.append(item.name)
+        return web.json_response({"names": names, "total": total})
+
+
+async def test_post_json_array_should_yield_validated_items(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post(
+        "/items",
+        json=[{"name": "foo", "quantity": 2}, {"name": "bar", "quantity": "3"}],
+    )
+    assert resp.status == 200
+    assert await resp.json() == {"names": ["foo", "bar"], "total": 5}
+
+
+async def test_post_empty_json_array_should_yield_nothing(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/items", data=" [ ] ")
+    assert resp.status == 200
+    assert await resp.json() == {"names": [], "total": 0}
+
+
+async def test_post_json_array_split_in_many_chunks(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+
+    async def chunks():
+        body = '[{"name": "foo", "quantity": 12345}, {"name": "b\\u00e9", "quantity": 1}]'
+        data = body.encode()
+        for i in range(0, len(data), 3):
+            yield data[i : i + 3]
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/items", data=chunks())
+    assert resp.status == 200
+    assert await resp.json() == {"names": ["foo", "bé"], "total": 12346}
+
+
+async def test_post_ndjson_should_yield_validated_items(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post(
+        "/items",
+        data=b'{"name": "foo", "quantity": 2}\n\n{"name": "bar", "quantity": 3}',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status == 200
+    assert await resp.json() == {"names": ["foo", "bar"], "total": 5}
+
+
+async def test_invalid_item_should_return_an_error_with_its_index(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post(
+        "/items",
+        data=b'{"name": "foo", "quantity": 2}\n{"name": "bar", "quantity": "x"}\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status == 418
+    assert resp.content_type == "application/json"
+    assert await resp.json() == [
+        {
+            "in": "body",
+            "loc": [1, "quantity"],
+            "msg": "value is not a valid integer",
+            "type": "type_error.integer",
+        }
+    ]
+
+
+async def test_malformed_json_array_should_return_bad_request(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+
+    client = await aiohttp_client(app)
+    for body in ('{"name": "foo"}', '[{"name": "foo", "quantity": 1} 3]', "[{"):
+        resp = await client.post("/items", data=body)
+        assert resp.status == 400
+        assert await resp.json() == {"error": "Malformed JSON"}
+
+
+async def test_json_array_with_escaped_strings_split_in_many_chunks(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+    items = [
+        {"name": 'a"}]\\', "quantity": 1},
+        {"name": "[{\\\"", "quantity": -20},
+    ]
+
+    async def chunks():
+        data = json.dumps(items).encode()
+        for i in range(0, len(data), 2):
+            yield data[i : i + 2]
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/items", data=chunks())
+    assert resp.status == 200
+    assert await resp.json() == {
+        "names": [item["name"] for item in items],
+        "total": -19,
+    }
+
+
+async def test_item_larger_than_client_max_size_should_be_rejected(
+    aiohttp_client, loop
+):
+    app = web.Application(client_max_size=64)
+    app.router.add_view("/items", BulkView)
+    small_item = {"name": "foo", "quantity": 1}
+    large_item = {"name": "x" * 64, "quantity": 1}
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/items", json=[small_item] * 10)
+    assert resp.status == 200
+    assert (await resp.json())["total"] == 10
+
+    for data, content_type in (
+        (json.dumps([small_item, large_item]), "application/json"),
+        (f"{json.dumps(small_item)}\n{json.dumps(large_item)}", "application/x-ndjson"),
+        ('[{"name": "' + "x" * 128, "application/json"),
+        ('{"name": "' + "x" * 128, "application/x-ndjson"),
+    ):
+        resp = await client.post(
+            "/items", data=data, headers={"Content-Type": content_type}
+        )
+        assert resp.status == 413
+        assert await resp.json() == {"error": "Item too large"}
+
+
+async def test_max_item_bytes_should_replace_client_max_size(aiohttp_client, loop):
+    class LargeItemsView(PydanticView):
+        async def post(
+            self,
+            items: Annotated[
+                AsyncIterator[ItemModel], BodyConstraints(max_item_bytes=256)
+            ],
+        ):
+            return web.json_response([item.name async for item in items])
+
+    app = web.Application(client_max_size=64)
+    app.router.add_view("/items", LargeItemsView)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/items", json=[{"name": "x" * 128, "quantity": 1}])
+    assert resp.status == 200
+    assert await resp.json() == ["x" * 128]
+
+    resp = await client.post("/items", json=[{"name": "x" * 256, "quantity": 1}])
+    assert resp.status == 413
+
+
+async def test_stream_body_should_be_documented_as_an_array(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/items", BulkView)
+    oas.setup(app)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/oas/spec")
+    item_schema = {
+        "properties": {
+            "name": {"title": "Name", "type": "string"},
+            "quantity": {"title": "Quantity", "type": "integer"},
+        },
+        "required": ["name", "quantity"],
+        "title": "ItemModel",
+        "type": "object",
+    }
+    assert (await resp.json())["paths"]["/items"]["post"]["requestBody"] == {
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": item_schema}},
+            "application/x-ndjson": {"schema": item_schema},
+        }
+    }
@@ -0,0 +1,82 @@
+from aiohttp import web
+from pydantic import BaseModel
+
+from aiohttp_pydantic import PydanticView
+
+
+class ArticleModel(BaseModel):
+    name: str
+    nb_page: int
+    year: int
+
+
+class ArticleView(PydanticView):
+    async def post(self, article: ArticleModel):
+        return web.json_response()
+
+
+class LimitedArticleView(ArticleView):
+    validation_error_status = 422
+    max_validation_errors = 1
+
+
+class ProblemArticleView(ArticleView):
+    validation_error_status = 422
+    problem_details = True
+
+
+class CustomArticleView(ArticleView):
+    def on_validation_error(self, errors):
+        return web.Response(status=400, text=f"{len(errors)} errors")
+
+
+async def post_invalid_article(aiohttp_client, view):
+    app = web.Application()
+    app.router.add_view("/article", view)
+
+    client = await aiohttp_client(app)
+    return await client.post("/article", json={"nb_page": "a", "year": "b"})
+
+
+async def test_all_errors_should_be_reported_by_default(aiohttp_client, loop):
+    resp = await post_invalid_article(aiohttp_client, ArticleView)
+    assert resp.status == 418
+    assert resp.content_type == "application/json"
+    assert [error["loc"] for error in await resp.json()] == [
+        ["name"],
+        ["nb_page"],
+        ["year"],
+    ]
+
+
+async def test_errors_should_be_capped(aiohttp_client, loop):
+    resp = await post_invalid_article(aiohttp_client, LimitedArticleView)
+    assert resp.status == 422
+    assert await resp.json() == [
+        {
+            "in": "body",
+            "loc": ["name"],
+            "msg": "field required",
+            "type": "value_error.missing",
+        }
+    ]
+
+
+async def test_errors_should_be_reported_as_problem_details(aiohttp_client, loop):
+    resp = await post_invalid_article(aiohttp_client, ProblemArticleView)
+    assert resp.status == 422
+    assert resp.content_type == "application/problem+json"
+    problem = await resp.json(content_type=None)
+    assert {key: problem[key] for key in ("type", "title", "status")} == {
+        "type": "about:blank",
+        "title": "Unprocessable Entity",
+        "status": 422,
+    }
+    assert len(problem["errors"]) == 3
+    assert problem["errors"][0]["in"] == "body"
+
+
+async def test_error_response_should_be_overridable(aiohttp_client, loop):
+    resp = await post_invalid_article(aiohttp_client, CustomArticleView)
+    assert resp.status == 400
+    assert await resp.text() == "3 errors"
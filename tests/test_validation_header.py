@@ -1,10 +1,13 @@
 import json
 from datetime import datetime
 from enum import Enum
+from types import SimpleNamespace
 
 from aiohttp import web
+from multidict import CIMultiDict
 
 from aiohttp_pydantic import PydanticView
+from aiohttp_pydantic.injectors import HeadersGetter
 
 
 class JSONEncoder(json.JSONEncoder):
@@ -134,3 +137,33 @@ async def test_correct_value_to_header_defined_with_str_enum(aiohttp_client, loo
     assert await resp.json() == {"format": "UMT"}
     assert resp.status == 200
     assert resp.content_type == "application/json"
+
+
+async def test_get_article_with_many_headers_should_inject_declared_ones_only(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/article", ArticleView)
+
+    client = await aiohttp_client(app)
+    headers = {f"X-Proxy-{i}": str(i) for i in range(40)}
+    headers["SIGNATURE-EXPIRED"] = "2020-10-04T18:01:00"
+    resp = await client.get("/article", headers=headers)
+    assert resp.status == 200
+    assert await resp.json() == {"signature": "2020-10-04T18:01:00"}
+
+
+def test_headers_getter_should_read_declared_headers_only():
+    class SpyHeaders(CIMultiDict):
+        def items(self):
+            raise AssertionError("all headers should not be read")
+
+    injector = HeadersGetter({"x_request_id": str, "accept": str}, {})
+    request = SimpleNamespace(
+        headers=SpyHeaders(
+            {"X-Request-Id": "42", "Accept": "text/plain", "X-Other": "foo"}
+        )
+    )
+    kwargs = {}
+    injector.inject(request, [], kwargs)
+    assert kwargs == {"x_request_id": "42", "accept": "text/plain"}
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from aiohttp import web
 
@@ -80,3 +80,54 @@ async def test_get_article_with_valid_qs_and_omitted_optional_should_return_defa
     assert await resp.json() == {"with_comments": True, "age": None, "nb_items": 7}
     assert resp.status == 200
     assert resp.content_type == "application/json"
+
+
+class ArticleFilterView(PydanticView):
+    async def get(
+        self, tags: List[str], ids: Optional[List[int]] = None, author: str = ""
+    ):
+        return web.json_response({"tags": tags, "ids": ids, "author": author})
+
+
+async def test_get_article_with_repeated_qs_should_return_a_list(aiohttp_client, loop):
+    app = web.Application()
+    app.router.add_view("/article", ArticleFilterView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get(
+        "/article",
+        params=[
+            ("tags", "a,b"),
+            ("ids", "1"),
+            ("tags", "c"),
+            ("ids", "2"),
+            ("author", "foo"),
+            ("author", "bar"),
+            ("undeclared", "x"),
+        ],
+    )
+    assert resp.status == 200
+    assert await resp.json() == {
+        "tags": ["a,b", "c"],
+        "ids": [1, 2],
+        "author": "foo,bar",
+    }
+
+
+async def test_get_article_with_wrong_list_item_should_return_an_error_message(
+    aiohttp_client, loop
+):
+    app = web.Application()
+    app.router.add_view("/article", ArticleFilterView)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/article", params=[("tags", "a"), ("ids", "foo")])
+    assert resp.status == 418
+    assert await resp.json() == [
+        {
+            "in": "query string",
+            "loc": ["ids", 0],
+            "msg": "value is not a valid integer",
+            "type": "type_error.integer",
+        }
+    ]